@@ -0,0 +1,73 @@
+"""
+Representative models for the benchmarks: transfer functions from first to high
+order, with and without dead time, and one IMC model string per tuning-table row.
+"""
+import numpy as np
+
+
+def _product(*factors):
+    """Coefficients of a product of polynomials, highest power first."""
+    out = np.array([1.0])
+    for factor in factors:
+        out = np.polymul(out, factor)
+    return [float(c) for c in out]
+
+
+def _lag(tau):
+    return [tau, 1.0]
+
+
+def _underdamped(tau, zeta):
+    return [tau**2, 2 * zeta * tau, 1.0]
+
+
+#### (name, num, den) from first to eighth order; every one is also used with delays
+_SHAPES = [
+    ("first_order", [2.0], _product(_lag(5.0))),
+    ("two_lags", [2.0], _product(_lag(5.0), _lag(3.0))),
+    ("underdamped", [2.0], _product(_underdamped(2.0, 0.4))),
+    ("rhp_zero", _product([-3.0, 1.0]), _product(_lag(5.0), _lag(3.0))),
+    ("lead_lag", _product([2.0, 1.0]), _product(_lag(5.0), _lag(1.0), _lag(0.5))),
+    ("fourth_order", [1.0], _product(_lag(1.0), _lag(1.0), _lag(1.0), _lag(1.0))),
+    ("fifth_mixed", _product([0.5, 1.0]), _product(_lag(4.0), _underdamped(1.5, 0.3), _lag(0.8), _lag(0.2))),
+    ("sixth_order", [3.0], _product(_lag(10.0), _lag(4.0), _underdamped(2.0, 0.6), _lag(1.0), _lag(0.5))),
+    ("eighth_order", _product([1.0, 1.0], [0.5, 1.0]),
+     _product(_lag(8.0), _lag(6.0), _underdamped(3.0, 0.2), _underdamped(1.0, 0.7), _lag(0.4), _lag(0.1))),
+]
+
+DELAYS = [0.0, 0.5, 2.0]
+
+TRANSFER_FUNCTIONS = [
+    {'name': f"{name}_delay{delay:g}", 'num': num, 'den': den, 'delay': delay}
+    for name, num, den in _SHAPES
+    for delay in DELAYS
+]
+
+#### delay-free systems, for the solvers that take no dead time
+RATIONAL_FUNCTIONS = [tf for tf in TRANSFER_FUNCTIONS if tf['delay'] == 0.0]
+
+#### worked examples from final_exam.py for the symbolic solvers; the irreducible
+#### cubic factor s³ + 6s² + 6s + 3 has no useful closed form (Cardano radicals)
+EXAM_SYSTEMS = [
+    {'name': "exam_cubic_step", 'num': [1.0, 3.0], 'den': _product([1.0, 0.0], [1.0, 6.0, 6.0, 3.0])},
+    {'name': "exam_cubic", 'num': _product([-1.0, -1.0], [1.0, 5.0]), 'den': [1.0, 6.0, 6.0, 3.0]},
+]
+
+#### one model string per row of imc_pid_table (used with epsilon = 1, which
+#### row M's lag τ = ϵ = 1 depends on)
+IMC_MODELS = {
+    'A': "2/(5s + 1)",
+    'B': "2/((5s + 1)(3s + 1))",
+    'C': "2/(4s² + 1.6s + 1)",
+    'D': "2(-3s + 1)/(5s + 1)",
+    'E': "2(-3s + 1)/((5s + 1)(3s + 1))",
+    'F': "2(-3s + 1)/(4s² + 1.6s + 1)",
+    'G': "2(-3s + 1)/((4s² + 1.6s + 1)(3s + 1))",
+    'H': "2/s",
+    'I': "2(2s + 1)/s",
+    'J': "2/(s(5s + 1))",
+    'K': "2(2s + 1)/(s(5s + 1)(2s + 1))",
+    'L': "2(-3s + 1)/s",
+    'M': "2(-3s + 1)/(s + 1)",
+    'N': "2(-3s + 1)/((s + 1)(2s + 1))",
+}
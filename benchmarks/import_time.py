@@ -0,0 +1,66 @@
+"""
+Import-time budget for the solvers package.
+
+Every module is imported in a fresh interpreter (best of several runs) and
+compared against its budget; the script exits non-zero when one is exceeded.
+
+    python benchmarks/import_time.py
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#### seconds per import, measured on top of a bare interpreter
+BUDGETS = {
+    'solvers': 0.02,
+    'solvers.bode_diagrams': 0.3,
+    'solvers.budget': 0.05,
+    'solvers.cache': 0.05,
+    'solvers.closed_loop': 0.3,
+    'solvers.composition': 0.3,
+    'solvers.delay': 0.05,
+    'solvers.feedback': 0.3,
+    'solvers.imc_epsilon': 0.3,
+    'solvers.imc_tuning_table': 0.02,
+    'solvers.instrumentation': 0.05,
+    'solvers.imc_tunning': 0.3,
+    'solvers.linearization': 0.3,
+    'solvers.plotting': 0.05,
+    'solvers.plotting_poles_and_zeros': 0.3,
+    'solvers.polynomials': 0.3,
+    'solvers.rendering': 0.05,
+    'solvers.results': 0.3,
+    'solvers.step_metrics': 0.3,
+    'solvers.step_response_plotting': 0.3,
+    'solvers.sympy_solvers': 0.3,
+    'solvers.symbolic_batch': 0.3,
+}
+
+_PROBE = "import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+
+def measure(module, repeat=5):
+    """Best-of-`repeat` import time of `module` in fresh interpreters, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", _PROBE.format(module=module)],
+                             cwd=ROOT, capture_output=True, text=True, check=True)
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    return min(timings)
+
+
+def main():
+    over_budget = []
+    for module, budget in BUDGETS.items():
+        seconds = measure(module)
+        status = "ok" if seconds <= budget else "OVER"
+        print(f"{module:<36} {seconds*1000:8.1f} ms  (budget {budget*1000:.0f} ms)  {status}")
+        if seconds > budget:
+            over_budget.append(module)
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
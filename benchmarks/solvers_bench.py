@@ -0,0 +1,346 @@
+"""
+Benchmarks of the solver paths on the model corpus in benchmarks/corpus.py.
+
+Every case is timed separately (best of several runs) and the results are
+appended to a local JSON-lines history (benchmarks/history.jsonl, ignored by
+git) together with the library versions, so a python-control, sympy or numpy
+upgrade can be compared against earlier runs:
+
+    python benchmarks/solvers_bench.py                  # run all, append to history
+    python benchmarks/solvers_bench.py --only step      # cases whose name contains "step"
+    python benchmarks/solvers_bench.py --compare        # also compare with the previous run
+
+With --compare the script exits non-zero when a case is slower than the previous
+run by more than --threshold.
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from importlib import metadata
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from corpus import EXAM_SYSTEMS, IMC_MODELS, RATIONAL_FUNCTIONS, TRANSFER_FUNCTIONS  # noqa: E402
+
+HISTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "history.jsonl")
+
+#### name -> setup function returning the callable to time
+CASES = {}
+
+
+def case(name):
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+def _quiet(func):
+    """Runs func with its printed output discarded (the sympy solvers print their results)."""
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+    return run
+
+
+def _symbolic(tf, s):
+    import sympy as sp
+    return sp.Poly(tf['num'], s).as_expr(), sp.Poly(tf['den'], s).as_expr()
+
+
+def _uncached_symbolics():
+    from solvers import symbolic_cache
+    symbolic_cache.enabled = False
+
+
+#### IMC tuning
+@case("imc_identify")
+def _imc_identify():
+    from solvers import identify_model_and_calculate_params
+    return lambda: [identify_model_and_calculate_params(eq, 1.0) for eq in IMC_MODELS.values()]
+
+
+@case("imc_batch")
+def _imc_batch():
+    from solvers import batch_identify_and_calculate_params
+    models = list(IMC_MODELS.values()) * 100
+    return lambda: batch_identify_and_calculate_params(models, epsilon=1.0)
+
+
+@case("imc_epsilon")
+def _imc_epsilon():
+    from solvers import optimize_epsilon
+    models = list(IMC_MODELS.values()) * 5
+    return lambda: optimize_epsilon(models)
+
+
+#### frequency domain
+@case("bode_margins")
+def _bode_margins():
+    from solvers import frequency_margins, frequency_response
+    nums = [tf['num'] for tf in TRANSFER_FUNCTIONS]
+    dens = [tf['den'] for tf in TRANSFER_FUNCTIONS]
+    delays = [tf['delay'] for tf in TRANSFER_FUNCTIONS]
+    return lambda: frequency_margins(*frequency_response(nums, dens, delays=delays))
+
+
+@case("bode_plot_files")
+def _bode_plot_files():
+    from solvers import bode_plot, bode_plot_with_delay
+    directory = tempfile.mkdtemp(prefix="bench_bode_")
+    # rendering dominates, so a low- and a high-order system at every delay suffice
+    systems = TRANSFER_FUNCTIONS[:3] + TRANSFER_FUNCTIONS[-3:]
+
+    def run():
+        for i, tf in enumerate(systems):
+            path = os.path.join(directory, f"{i}.png")
+            if tf['delay']:
+                bode_plot_with_delay(tf['num'], tf['den'], tf['delay'], path=path)
+            else:
+                bode_plot(tf['num'], tf['den'], path=path)
+    return _quiet(run)
+
+
+#### time domain
+@case("step_responses")
+def _step_responses():
+    from solvers import step_metrics, step_responses
+    nums = [tf['num'] for tf in TRANSFER_FUNCTIONS]
+    dens = [tf['den'] for tf in TRANSFER_FUNCTIONS]
+    delays = [tf['delay'] for tf in TRANSFER_FUNCTIONS]
+    return lambda: step_metrics(*step_responses(nums, dens, delays=delays))
+
+
+@case("closed_loop")
+def _closed_loop():
+    from solvers import PIDLoops, batch_identify_and_calculate_params
+    tuned = batch_identify_and_calculate_params(list(IMC_MODELS.values()) * 20, epsilon=1.0)
+
+    def run():
+        loops = PIDLoops.from_tuning(tuned, delays=0.2, dt=0.01, u_min=-5, u_max=5)
+        loops.run(50, disturbance=lambda t: np.where(t >= 25, 0.5, 0.0))
+    return run
+
+
+#### root locus and feedback
+@case("root_locus")
+def _root_locus():
+    from solvers import RootLocus
+    gains = np.linspace(0, 50, 1000)
+    return lambda: [RootLocus(tf['num'], tf['den']).poles(gains) for tf in RATIONAL_FUNCTIONS]
+
+
+@case("feedback")
+def _feedback():
+    from solvers import feedback
+    c_s = [[1.0, 1.0, 1.0], [1.0, 0.0]]
+    return _quiet(lambda: [feedback(c_s, [tf['num'], tf['den']]) for tf in RATIONAL_FUNCTIONS])
+
+
+@case("composition")
+def _composition():
+    from solvers import clear_composition_cache, feedback_loop, parallel, series
+    systems = [(tf['num'], tf['den']) for tf in RATIONAL_FUNCTIONS]
+    controller = ([1.0, 1.0, 1.0], [0.1, 1.0, 0.0])
+
+    def run():
+        clear_composition_cache()
+        parallel(*systems).transfer_function()
+        series(*systems[:8]).transfer_function()
+        [feedback_loop(series(controller, plant)).transfer_function() for plant in systems]
+    return run
+
+
+@case("stability_map")
+def _stability_map():
+    from solvers import pid_controller, stability_map
+    plant = RATIONAL_FUNCTIONS[5]
+    k_c, tau_I = np.linspace(0.01, 5, 200), np.linspace(0.1, 20, 200)
+    return lambda: stability_map(lambda k, ti: pid_controller(k, ti), [plant['num'], plant['den']], k_c, tau_I)
+
+
+#### linearization
+@case("linearization")
+def _linearization():
+    import sympy as sp
+    from solvers import CompiledLinearization, linearization_of_system
+    c_a, T, q = sp.symbols('c_a T q')
+    rate = sp.exp(25 - 8000 / T) * c_a
+    f = [q * (1 - c_a) - rate, q * (350 - T) + 200 * rate - 0.5 * (T - 300)]
+    x_ops = np.column_stack([np.linspace(0.1, 0.9, 10000), np.linspace(320, 380, 10000)])
+    u_ops = np.linspace(0.5, 1.5, 10000)[:, None]
+
+    def run():
+        CompiledLinearization(f, (c_a, T), (q,)).matrices(x_ops, u_ops)
+        linearization_of_system(sp.sqrt(sp.Symbol('x')))
+    return _quiet(run)
+
+
+#### symbolic solvers, with the result cache disabled so the work is measured
+@case("sympy_partial_fractions")
+def _sympy_partial_fractions():
+    import sympy as sp
+    from solvers import partial_fraction_decomposition
+    _uncached_symbolics()
+    s = sp.symbols('s', real=True)
+    systems = [_symbolic(tf, s) for tf in RATIONAL_FUNCTIONS[:5]]
+    return _quiet(lambda: [partial_fraction_decomposition(num, den) for num, den in systems])
+
+
+@case("sympy_inverse_laplace")
+def _sympy_inverse_laplace():
+    import sympy as sp
+    from solvers import inverse_laplace_transform
+    _uncached_symbolics()
+    s = sp.symbols('s', real=True)
+    systems = []
+    for tf in TRANSFER_FUNCTIONS[:15]:
+        num, den = _symbolic(tf, s)
+        systems.append(sp.exp(-sp.nsimplify(tf['delay']) * s) * num / (den * s))
+    for tf in EXAM_SYSTEMS:
+        num, den = _symbolic(tf, s)
+        systems.append(num / den)
+    return _quiet(lambda: [inverse_laplace_transform(eq, s) for eq in systems])
+
+
+@case("sympy_split_magnitude")
+def _sympy_split_magnitude():
+    import sympy as sp
+    from solvers import find_magnitude, split_system
+    _uncached_symbolics()
+    s = sp.symbols('s', real=True)
+    systems = [_symbolic(tf, s) for tf in RATIONAL_FUNCTIONS]
+
+    def run():
+        for num, den in systems:
+            split_system(num, den)
+            find_magnitude(num / den)
+    return _quiet(run)
+
+
+@case("sympy_poles_zeros")
+def _sympy_poles_zeros():
+    import sympy as sp
+    from solvers import find_poles_and_zeros
+    s = sp.symbols('s', real=True)
+    systems = [_symbolic(tf, s) for tf in RATIONAL_FUNCTIONS[:5]]
+    return _quiet(lambda: [find_poles_and_zeros(num, den) for num, den in systems])
+
+
+@case("sympy_crossovers")
+def _sympy_crossovers():
+    import sympy as sp
+    from solvers import find_crossovers
+    s, k = sp.symbols('s k', real=True)
+    systems = [_symbolic(tf, s) for tf in RATIONAL_FUNCTIONS]
+    gains = np.linspace(0.1, 50, 1000)
+    return lambda: [find_crossovers(k * num, den, gain=k, gain_values=gains) for num, den in systems]
+
+
+#### running and recording
+def measure(setup, repeat=3):
+    """Best-of-`repeat` wall time of the callable returned by setup, in seconds."""
+    run = setup()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _versions():
+    versions = {}
+    for package in ("numpy", "scipy", "sympy", "control", "pandas", "matplotlib"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def _commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def load_history(path=HISTORY):
+    """All recorded runs, oldest first."""
+    if not os.path.exists(path):
+        return []
+    with open(path) as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def compare(results, previous, threshold):
+    """Prints the ratio to the previous run per case; returns the cases slower than threshold."""
+    slower = []
+    for name, seconds in results.items():
+        before = previous['results'].get(name)
+        if not before:
+            continue
+        ratio = seconds / before
+        flag = "SLOWER" if ratio > threshold else ""
+        print(f"{name:<28} {before*1000:10.1f} ms -> {seconds*1000:10.1f} ms  x{ratio:5.2f}  {flag}")
+        if ratio > threshold:
+            slower.append(name)
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="*", default=None, help="run cases whose name contains one of these")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--history", default=HISTORY)
+    parser.add_argument("--no-save", action="store_true", help="do not append this run to the history")
+    parser.add_argument("--compare", action="store_true", help="compare with the previous recorded run")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio counted as a regression")
+    args = parser.parse_args(argv)
+
+    import matplotlib
+    matplotlib.use("Agg")
+
+    results = {}
+    for name, setup in CASES.items():
+        if args.only and not any(part in name for part in args.only):
+            continue
+        results[name] = measure(setup, args.repeat)
+        print(f"{name:<28} {results[name]*1000:10.1f} ms")
+
+    history = load_history(args.history)
+    record = {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'versions': _versions(),
+        'repeat': args.repeat,
+        'results': results,
+    }
+    if not args.no_save:
+        with open(args.history, "a") as handle:
+            handle.write(json.dumps(record) + "\n")
+
+    if args.compare and history:
+        print(f"\ncompared with {history[-1]['timestamp']} ({history[-1]['commit']}):")
+        return 1 if compare(results, history[-1], args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -141,6 +141,7 @@ def system_step_response(num1, den1):
     plt.legend()
     plt.show()
 
-num = [0.7, 0.55*3]
-den = [1, 6, 5.55, 3*0.7]
-system_step_response(num,den)
\ No newline at end of file
+if __name__ == "__main__":
+    num = [0.7, 0.55*3]
+    den = [1, 6, 5.55, 3*0.7]
+    system_step_response(num,den)
@@ -0,0 +1,134 @@
+"""
+Process control solvers: IMC tuning, frequency and step responses, poles and
+zeros, feedback, linearization and symbolic helpers.
+
+Submodules and their dependencies are imported on first use, so
+`import solvers` itself is cheap:
+
+    from solvers import identify_model_and_calculate_params
+"""
+import importlib
+import sys
+import types
+
+#### public name -> submodule providing it
+_EXPORTS = {
+    'bode_plot': 'bode_diagrams',
+    'bode_plot_with_delay': 'bode_diagrams',
+    'bode_plot_multi_sys': 'bode_diagrams',
+    'bode_plot_with_delay_multi_sys': 'bode_diagrams',
+    'frequency_response': 'bode_diagrams',
+    'frequency_margins': 'bode_diagrams',
+    'SolverBudget': 'budget',
+    'BudgetExceeded': 'budget',
+    'PIDLoops': 'closed_loop',
+    'simulate_loops': 'closed_loop',
+    'Block': 'composition',
+    'as_block': 'composition',
+    'series': 'composition',
+    'parallel': 'composition',
+    'feedback_loop': 'composition',
+    'clear_composition_cache': 'composition',
+    'SymbolicCache': 'cache',
+    'symbolic_cache': 'cache',
+    'pade': 'delay',
+    'instrument': 'instrumentation',
+    'profiling': 'instrumentation',
+    'feedback': 'feedback',
+    'pid_controller': 'feedback',
+    'stability_map': 'feedback',
+    'imc_pid_table': 'imc_tuning_table',
+    'identify_model_and_calculate_params': 'imc_tunning',
+    'batch_identify_and_calculate_params': 'imc_tunning',
+    'parse_process_model': 'imc_tunning',
+    'imc_pid_params': 'imc_tunning',
+    'model_polynomials': 'imc_tunning',
+    'optimize_epsilon': 'imc_epsilon',
+    'linearization_of_system': 'linearization',
+    'linearization_system_with_multiple_variables': 'linearization',
+    'CompiledLinearization': 'linearization',
+    'compile_linearization': 'linearization',
+    'plotting_equation': 'plotting',
+    'plotting_poles_zeros': 'plotting_poles_and_zeros',
+    'poles_and_zeros': 'plotting_poles_and_zeros',
+    'plotting_poles_and_zeros_multi_sys': 'plotting_poles_and_zeros',
+    'update_root_locus': 'plotting_poles_and_zeros',
+    'RootLocus': 'plotting_poles_and_zeros',
+    'root_locus': 'plotting_poles_and_zeros',
+    'stack_coefficients': 'polynomials',
+    'polyval_batch': 'polynomials',
+    'polymul_batch': 'polynomials',
+    'stack_pair': 'polynomials',
+    'batch_roots': 'polynomials',
+    'render_batch': 'rendering',
+    'clear_figure_cache': 'rendering',
+    'Result': 'results',
+    'Batch': 'results',
+    'Margins': 'results',
+    'MarginsBatch': 'results',
+    'PhaseMargin': 'results',
+    'FrequencySplit': 'results',
+    'Magnitude': 'results',
+    'PolesZeros': 'results',
+    'PolesZerosBatch': 'results',
+    'Crossovers': 'results',
+    'CrossoversBatch': 'results',
+    'StabilityPoint': 'results',
+    'StabilityMap': 'results',
+    'FeedbackResult': 'results',
+    'Decomposition': 'results',
+    'ExpressionResult': 'results',
+    'SymbolicJobResult': 'results',
+    'step_metrics': 'step_metrics',
+    'solve_symbolic_batch': 'symbolic_batch',
+    'system_step_response': 'step_response_plotting',
+    'multi_system_step_response': 'step_response_plotting',
+    'step_responses': 'step_response_plotting',
+    'step_horizon': 'step_response_plotting',
+    'state_space_step_responses': 'step_response_plotting',
+    'companion_state_space': 'step_response_plotting',
+    'zoh_discretize': 'step_response_plotting',
+    'partial_fraction_decomposition': 'sympy_solvers',
+    'inverse_laplace_transform': 'sympy_solvers',
+    'compile_inverse_laplace': 'sympy_solvers',
+    'CompiledInverseLaplace': 'sympy_solvers',
+    'split_system': 'sympy_solvers',
+    'find_magnitude': 'sympy_solvers',
+    'find_poles_and_zeros': 'sympy_solvers',
+    'find_phase_margin': 'sympy_solvers',
+    'find_crossovers': 'sympy_solvers',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    # importing a submodule binds it on the package; the exported name wins
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+class _Package(types.ModuleType):
+    """
+    The package module. The import system binds every imported submodule on the
+    package; for feedback and step_metrics, which share their name with the
+    function they export, the function is bound in place of the module, so
+    `from solvers import feedback` means the same before and after any
+    `import solvers.feedback`. The submodules stay importable by their names.
+    """
+
+    def __setattr__(self, name, value):
+        if (isinstance(value, types.ModuleType) and _EXPORTS.get(name) == name
+                and value.__name__ == f"{__name__}.{name}"):
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
@@ -0,0 +1,45 @@
+import contextlib
+import signal
+import threading
+import time
+
+
+class SolverTimeout(BaseException):
+    """
+    Raised inside a call that overran its time limit. It derives from
+    BaseException so that `except Exception` clauses inside sympy cannot
+    swallow it.
+    """
+
+
+def can_interrupt():
+    """Whether time_limit can interrupt the current thread (POSIX main thread only)."""
+    return hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread()
+
+
+@contextlib.contextmanager
+def time_limit(seconds):
+    """
+    Raises SolverTimeout in the block once `seconds` of wall time have passed,
+    using SIGALRM. None, or a thread/platform without SIGALRM, runs the block
+    without a limit. Nested limits keep the tighter deadline and the outer
+    timer is re-armed on exit.
+    """
+    if seconds is None or not can_interrupt():
+        yield
+        return
+
+    def expire(signum, frame):
+        raise SolverTimeout(f"exceeded the {seconds:g} s time limit")
+
+    previous_handler = signal.signal(signal.SIGALRM, expire)
+    outer, _ = signal.setitimer(signal.ITIMER_REAL, 0)
+    start = time.monotonic()
+    signal.setitimer(signal.ITIMER_REAL, min(seconds, outer) if outer else seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+        if outer:
+            signal.setitimer(signal.ITIMER_REAL, max(outer - (time.monotonic() - start), 1e-3))
@@ -1,17 +1,29 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import control as ctrl 
-import sympy as sp
+from ._lazy import lazy_import
+from .composition import parallel
+from .instrumentation import instrument, stage
+from .polynomials import polyval_batch, stack_coefficients
+from .rendering import finish, get_axes
+from .results import Margins, MarginsBatch
+
+ctrl = lazy_import("control")
 
 #### plotting bode plots
-def bode_plot(num, den):
-    sys = ctrl.TransferFunction(num,den)
-    gm, pm,wp,wg = ctrl.margin(sys)           
+@instrument(size=lambda num, den, *args, **kwargs: len(den) - 1)
+def bode_plot(num, den, path=None, verbose=True):
+    with stage("control.TransferFunction"):
+        sys = ctrl.TransferFunction(num,den)
+    with stage("control.margin"):
+        gm, pm,wp,wg = ctrl.margin(sys)
     omega = np.logspace(-2,3,500, base=10)
-    ctrl.bode(sys, omega, dB=True)
-    plt.xlim(0.01,500)
-    plt.show()
-    return print(f"gain margin ={gm}, phase margin = {pm}, phase frequency = {wg}, gain frequency = {wp}")
+    fig, axes = get_axes('bode', nrows=2, path=path)
+    with stage("control.bode_plot"):
+        ctrl.bode_plot(sys, omega, dB=True, ax=axes)
+    for ax in axes.flat:
+        ax.set_xlim(0.01,500)
+    finish(fig, path)
+    margins = Margins(gm, pm, wp, wg)
+    return margins.show() if verbose else margins
 
 # num = [40]
 # den = [1,2,1]
@@ -19,61 +31,78 @@ def bode_plot(num, den):
 
 
 #### bode plot of a system with time delay
-def bode_plot_with_delay(num, den, delay):
-    num_d, den_d = ctrl.pade(delay,8)
-    d_fun = ctrl.TransferFunction(num_d,den_d)
-
-    sys = ctrl.TransferFunction(num, den)
-    sys_d = sys * d_fun
-    gm, pm, wp, wg = ctrl.margin(sys_d)
+@instrument(size=lambda num, den, *args, **kwargs: len(den) - 1)
+def _plot_delay_bode(num, den, delay, omega, path):
+    """
+    Margins and Bode plot of num/den · e^(-delay s), using the exact delay factor
+    on the frequency grid instead of a Padé approximation.
+    """
+    num, den = stack_coefficients(num), stack_coefficients(den)
+    return _plot_response_bode(lambda w: polyval_batch(num, 1j * w) / polyval_batch(den, 1j * w),
+                               delay, omega, path)
+
+
+def _plot_response_bode(response, delay, omega, path):
+    """
+    Margins and Bode plot of any response function, omega (W,) -> G(jω) (1, W),
+    behind an optional exact delay; the margins come from a dense grid.
+    """
+    w_dense = np.logspace(-3, 3, 20000, base=10)
+    margins = frequency_margins(w_dense, *_magnitude_phase(response(w_dense), w_dense, True, delay))[0]
+
+    mag, phase = _magnitude_phase(response(omega), omega, True, delay)
+    fig, axes = get_axes('bode', nrows=2, path=path)
+    axes[0, 0].semilogx(omega, mag[0])
+    axes[0, 0].set_ylabel('Magnitude [dB]')
+    axes[1, 0].semilogx(omega, phase[0])
+    axes[1, 0].set_ylabel('Phase [deg]')
+    axes[1, 0].set_xlabel('Frequency [rad/sec]')
+    for ax in axes.flat:
+        ax.grid(which = 'both', linewidth = 0.5)
+        ax.set_xlim(omega[0], omega[-1])
+    finish(fig, path)
+    return margins
+
+
+def bode_plot_with_delay(num, den, delay, path=None, verbose=True):
     omega = np.logspace(-1,2,500, base=10)
+    margins = _plot_delay_bode(num, den, delay, omega, path)
 
-    ctrl.bode(sys_d, omega, dB=True )
-    plt.xlim(0.1,100)
-    plt.show()
-
-    return print(f"gain margin = {gm}, phase margin = {pm}, gain frequency = {wg}, phase frequency = {wp}")
+    return margins.show() if verbose else margins
 
 
 # bode_plot_with_delay([1,4],[1,2,4], 1) #### sample plotting
 
 
 #### plotting bode plots
-def bode_plot_multi_sys(num1, den1, num2, den2):
-    sys1 = ctrl.TransferFunction(num1,den2)
-    sys2 = ctrl.TransferFunction(num2, den2)
-    sys = sys1 + sys2
-    gm, pm,wp,wg = ctrl.margin(sys)           
+def bode_plot_multi_sys(num1, den1, num2, den2, *systems, path=None, verbose=True):
+    """
+    Margins and Bode plot of num1/den1 + num2/den2 + any further systems
+    ((num, den) pairs or Blocks), summed in state space and reduced to a
+    minimal realization (see composition.parallel).
+    """
+    block = parallel((num1, den1), (num2, den2), *systems)
     omega = np.logspace(-1,2,500, base=10)
-    ctrl.bode(sys, omega, dB=True)
-    plt.xlim(0.1,100)
-    plt.show()
-    return print(f"gain margin ={gm}, phase margin = {pm}, gain frequency = {wg}, phase frequency = {wp}")
+    # evaluated from the Block itself: polynomial coefficients of a large sum lose the response
+    margins = _plot_response_bode(lambda w: block.frequency_response(w)[None], None, omega, path)
+    return margins.show() if verbose else margins
 
 # num1 = [40]
 # den1 = [1,2,1]
 # num2 = [1]
 # den2 = [1,2,1]
 # bode_plot_multi_sys(num1,den1,num2, den2) ####### sample plotting
+# bode_plot_multi_sys(num1,den1,num2, den2, ([1],[1,1]), ([2],[1,3])) ####### any number of systems
 
 
 #### bode plot of a system with time delay
-def bode_plot_with_delay_multi_sys(num1, den1, num2, den2, delay):
-    num_d, den_d = ctrl.pade(delay,8)
-    d_fun = ctrl.TransferFunction(num_d,den_d)
-
-    sys1 = ctrl.TransferFunction(num1, den1)
-    sys2 = ctrl.TransferFunction(num2, den2)
-    
-    sys_d = (sys1 + sys2) * d_fun
-    gm, pm, wp, wg = ctrl.margin(sys_d)
+def bode_plot_with_delay_multi_sys(num1, den1, num2, den2, delay, *systems, path=None, verbose=True):
+    """As bode_plot_multi_sys, with the sum of the systems behind a time delay."""
+    block = parallel((num1, den1), (num2, den2), *systems)
     omega = np.logspace(-1,2,500, base=10)
+    margins = _plot_response_bode(lambda w: block.frequency_response(w)[None], delay, omega, path)
 
-    ctrl.bode(sys_d, omega, dB=True )
-    plt.xlim(0.1,100)
-    plt.show()
-
-    return print(f"gain margin = {gm}, phase margin = {pm}, gain frequency = {wg}, phase frequency = {wp}")
+    return margins.show() if verbose else margins
 
 
 # num1 = [40]
@@ -83,3 +112,105 @@ def bode_plot_with_delay_multi_sys(num1, den1, num2, den2, delay):
 # delay = 1
 # bode_plot_with_delay_multi_sys(num1,den1,num2, den2,delay) ####### sample plotting
 
+
+
+#### vectorized frequency response of many systems, no plotting
+@instrument(size=lambda nums, dens, omega=None, *args, **kwargs: 500 if omega is None else np.size(omega))
+def frequency_response(nums, dens, omega=None, dB=True, delays=None):
+    """
+    Evaluates the magnitude and unwrapped phase of N transfer functions on a shared
+    frequency grid in one broadcasted pass.
+
+    Args:
+        nums, dens: N numerator / denominator coefficient lists (highest power first),
+            or a single coefficient list each
+        omega: frequency grid in rad/s (default: np.logspace(-2, 3, 500))
+        dB: return the magnitude in dB (default) or as an absolute ratio
+        delays: optional time delay θ, scalar or one per system; applied exactly as
+            e^(-jωθ), which leaves the magnitude unchanged and subtracts ωθ from the phase
+
+    Returns:
+        omega (W,), magnitude (N, W), phase in degrees (N, W)
+    """
+    if omega is None:
+        omega = np.logspace(-2, 3, 500, base=10)
+    omega = np.asarray(omega, dtype=float)
+    jw = 1j * omega
+    response = polyval_batch(stack_coefficients(nums), jw) / polyval_batch(stack_coefficients(dens), jw)
+    return (omega,) + _magnitude_phase(response, omega, dB, delays)
+
+
+def _magnitude_phase(response, omega, dB=True, delays=None):
+    """Magnitude and unwrapped phase in degrees of a complex (N, W) response, see frequency_response."""
+    magnitude = np.abs(response)
+    if dB:
+        magnitude = 20 * np.log10(magnitude)
+    phase = np.degrees(np.unwrap(np.angle(response), axis=1))
+    if delays is not None:
+        delays = np.asarray(delays, dtype=float).reshape(-1, 1)
+        phase = phase - np.degrees(delays * omega)
+    return magnitude, phase
+
+
+def _first_crossing(omega, values, band, width, offset):
+    """
+    Finds, per row, the first grid interval where the band index changes and
+    linearly interpolates the crossing of the band boundary (band * width + offset)
+    in log(omega).
+
+    Returns:
+        crossing frequencies (N,), NaN where a row never crosses,
+        plus the interpolation fractions and interval indices for reuse on other arrays
+    """
+    crossed = band[:, 1:] != band[:, :-1]
+    has_crossing = crossed.any(axis=1)
+    k = np.argmax(crossed, axis=1)
+    rows = np.arange(values.shape[0])
+
+    v0, v1 = values[rows, k], values[rows, k + 1]
+    target = np.maximum(band[rows, k], band[rows, k + 1]) * width + offset
+    with np.errstate(divide='ignore', invalid='ignore'):
+        frac = np.where(v1 != v0, (target - v0) / (v1 - v0), 0.0)
+    # rows without a crossing interpolate nothing, so no junk reaches the exponent
+    frac = np.where(has_crossing, frac, 0.0)
+    log_w = np.log10(omega)
+    w = 10 ** (log_w[k] + frac * (log_w[k + 1] - log_w[k]))
+    return np.where(has_crossing, w, np.nan), frac, k
+
+
+@instrument(size=lambda omega, magnitude, *args, **kwargs: np.size(magnitude))
+def frequency_margins(omega, magnitude, phase, dB=True):
+    """
+    Gain and phase margins of N systems from their sampled frequency responses,
+    computed without a per-system loop (first crossing on the grid, interpolated).
+
+    Args:
+        omega, magnitude, phase: output of frequency_response
+        dB: whether magnitude is given in dB
+
+    Returns:
+        A MarginsBatch of gm (absolute ratio), pm (degrees), wcg (phase crossover),
+        wcp (gain crossover) arrays, which also unpacks in that order; gm is inf and
+        wcg NaN without a phase crossover, pm and wcp NaN without a gain crossover
+    """
+    mag_db = magnitude if dB else 20 * np.log10(magnitude)
+    rows = np.arange(mag_db.shape[0])
+
+    # gain crossover: |G| passes through 0 dB
+    wcp, frac, k = _first_crossing(omega, mag_db, (mag_db >= 0).astype(float), 0.0, 0.0)
+    phase_at = phase[rows, k] + frac * (phase[rows, k + 1] - phase[rows, k])
+    pm = np.where(np.isnan(wcp), np.nan, (phase_at + 360.0) % 360.0 - 180.0)
+
+    # phase crossover: phase passes through -180 (mod 360)
+    wcg, frac, k = _first_crossing(omega, phase, np.floor((phase + 180.0) / 360.0), 360.0, -180.0)
+    mag_at = mag_db[rows, k] + frac * (mag_db[rows, k + 1] - mag_db[rows, k])
+    mag_at = np.where(np.isnan(wcg), 0.0, mag_at)
+    gm = np.where(np.isnan(wcg), np.inf, 10 ** (-mag_at / 20))
+    return MarginsBatch(gm, pm, wcg, wcp)
+
+
+# nums = [[40], [1, 3]]
+# dens = [[1, 2, 1], [1, 6, 5, 0]]
+# omega, mag, phase = frequency_response(nums, dens) ####### arrays of shape (2, 500)
+# gm, pm, wcg, wcp = frequency_margins(omega, mag, phase)
+# frequency_margins(omega, mag, phase).to_frame() ####### one row per system
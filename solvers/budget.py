@@ -0,0 +1,101 @@
+import os
+
+from ._deadline import SolverTimeout, time_limit
+from ._lazy import lazy_import
+
+sp = lazy_import("sympy")
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised when a symbolic call ran out of budget and no numeric equivalent could stand in."""
+
+
+class SolverBudget:
+    """
+    Time and complexity limits for one symbolic solver call.
+
+    Args:
+        seconds: wall-clock limit of the exact computation (None: unlimited). It is
+            enforced with SIGALRM, so only in the main thread on POSIX systems.
+        max_degree: highest denominator degree in s attempted exactly
+        max_ops: largest input, in sympy operation count, attempted exactly
+        fallback: degrade to the numeric equivalent (default) or raise BudgetExceeded
+    """
+    __slots__ = ('seconds', 'max_degree', 'max_ops', 'fallback')
+
+    def __init__(self, seconds=None, max_degree=None, max_ops=None, fallback=True):
+        self.seconds = seconds
+        self.max_degree = max_degree
+        self.max_ops = max_ops
+        self.fallback = fallback
+
+    @classmethod
+    def coerce(cls, budget):
+        """None -> DEFAULT_BUDGET, a number -> a time limit in seconds, a SolverBudget as is."""
+        if budget is None:
+            return DEFAULT_BUDGET
+        if isinstance(budget, cls):
+            return budget
+        return cls(seconds=float(budget))
+
+    @property
+    def unlimited(self):
+        return self.seconds is None and self.max_degree is None and self.max_ops is None
+
+    def check(self, expr, s):
+        """Why expr is too complex to attempt exactly, or None when it is within the limits."""
+        expr = sp.sympify(expr)
+        if self.max_degree is not None:
+            try:
+                degree = sp.degree(sp.denom(sp.together(expr)), s)
+            except sp.PolynomialError:
+                degree = None
+            if degree is not None and degree > self.max_degree:
+                return f"degree {degree} is over the budget of {self.max_degree}"
+        if self.max_ops is not None:
+            ops = sp.count_ops(expr)
+            if ops > self.max_ops:
+                return f"{ops} operations are over the budget of {self.max_ops}"
+        return None
+
+    def __repr__(self):
+        return (f"SolverBudget(seconds={self.seconds}, max_degree={self.max_degree}, "
+                f"max_ops={self.max_ops}, fallback={self.fallback})")
+
+
+#### unlimited unless SOLVERS_TIME_BUDGET (seconds) is set in the environment
+DEFAULT_BUDGET = SolverBudget(seconds=float(os.environ["SOLVERS_TIME_BUDGET"])
+                              if os.environ.get("SOLVERS_TIME_BUDGET") else None)
+
+
+def solve_within(budget, exact, numeric, expr, s):
+    """
+    Runs exact() within budget, measuring complexity on expr (a function of s);
+    when the budget is exceeded, numeric() stands in.
+
+    Returns:
+        (value, approximate): approximate is True when numeric() produced the value
+    """
+    budget = SolverBudget.coerce(budget)
+    if budget.unlimited:
+        return exact(), False
+
+    reason = budget.check(expr, s)
+    if reason is None:
+        try:
+            with time_limit(budget.seconds):
+                return exact(), False
+        except SolverTimeout as exc:
+            reason = str(exc)
+    if not budget.fallback:
+        raise BudgetExceeded(reason)
+    try:
+        return numeric(), True
+    except Exception as exc:
+        raise BudgetExceeded(f"{reason}; no numeric equivalent: {exc}") from exc
+
+
+#### how to use
+# partial_fraction_decomposition(num, den, budget=2.0)             ##### at most ~2 s, then numeric residues
+# find_phase_margin(num, den, budget=SolverBudget(seconds=1, max_degree=6))
+# export SOLVERS_TIME_BUDGET=5                                      ##### default for every call
@@ -0,0 +1,183 @@
+import functools
+import hashlib
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+
+from ._lazy import lazy_import
+
+sp = lazy_import("sympy")
+
+_DEFAULT_DIRECTORY = os.path.join(os.path.expanduser("~"), ".cache", "process_exam_solvers")
+
+#### part of every key: bump when the pickled result types change, so old entries are never read
+SCHEMA_VERSION = 1
+_TEMP_SUFFIX = ".tmp"
+
+
+#### content-addressed cache for expensive symbolic results
+class SymbolicCache:
+    """
+    Two-tier cache for symbolic results, keyed by the cache schema, the operation
+    name and version and a canonical serialization (sympy srepr) of the arguments.
+    An operation whose results change bumps its version (memoize(..., version=)),
+    so entries written by older code are simply never looked up again.
+
+    The memory tier is an LRU of `memory_size` entries. The disk tier stores one
+    pickle per key under `directory` and is kept below `disk_limit` bytes by
+    evicting the least recently used files (by modification time, refreshed on
+    every hit). Its size is tracked per write and rescanned from the directory
+    every `rescan_every` writes, to account for other processes sharing it.
+    Set the environment variable SOLVERS_CACHE=0 to disable both tiers,
+    or SOLVERS_CACHE_DIR to move the disk tier.
+    """
+
+    def __init__(self, directory=None, memory_size=256, disk_limit=256 * 1024 * 1024, rescan_every=256):
+        self.directory = directory or os.environ.get("SOLVERS_CACHE_DIR", _DEFAULT_DIRECTORY)
+        self.memory_size = memory_size
+        self.disk_limit = disk_limit
+        self.rescan_every = rescan_every
+        self.enabled = os.environ.get("SOLVERS_CACHE", "1") != "0"
+        self._memory = OrderedDict()
+        self._disk_usage = None
+        self._writes = 0
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def key(operation, args, version=1):
+        parts = [f"schema={SCHEMA_VERSION}", f"{operation}@{version}"]
+        for arg in args:
+            try:
+                parts.append(sp.srepr(sp.sympify(arg)))
+            except (sp.SympifyError, TypeError):
+                parts.append(repr(arg))
+        return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".pickle")
+
+    def get(self, key):
+        """Returns (True, value) on a hit, (False, None) on a miss."""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return True, self._memory[key]
+        path = self._path(key)
+        try:
+            with open(path, "rb") as handle:
+                value = pickle.load(handle)
+            os.utime(path)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            self.misses += 1
+            return False, None
+        self._remember(key, value)
+        self.hits += 1
+        return True, value
+
+    def set(self, key, value):
+        self._remember(key, value)
+        path = self._path(key)
+        temp = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix=_TEMP_SUFFIX,
+                                             delete=False) as handle:
+                temp = handle.name
+                pickle.dump(value, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            size = os.path.getsize(temp)
+            try:
+                size -= os.path.getsize(path)
+            except OSError:
+                pass
+            os.replace(temp, path)
+            temp = None
+        except (OSError, pickle.PicklingError):
+            return
+        finally:
+            # an interrupted or failed write leaves no temp file behind
+            if temp is not None:
+                try:
+                    os.remove(temp)
+                except OSError:
+                    pass
+        self._account(size)
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _account(self, size):
+        """Adds a write of `size` bytes to the tracked disk usage; walks the directory only when needed."""
+        self._writes += 1
+        if self._disk_usage is None or self._writes % self.rescan_every == 0:
+            self._disk_usage = sum(size for _, size, _ in self._entries())
+        else:
+            self._disk_usage += size
+        if self._disk_usage > self.disk_limit:
+            self._evict()
+
+    def _entries(self):
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".pickle"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.disk_limit:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        self._disk_usage = total
+
+    def clear(self, disk=False):
+        """Empties the memory tier, and the disk tier too with disk=True (including stray temp files)."""
+        self._memory.clear()
+        if disk:
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if name.endswith((".pickle", _TEMP_SUFFIX)):
+                        try:
+                            os.remove(os.path.join(root, name))
+                        except OSError:
+                            continue
+            self._disk_usage = 0
+
+    def memoize(self, operation, version=1):
+        """
+        Decorator caching a function's result under `operation` and its arguments;
+        bump `version` whenever the function's results change.
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args):
+                if not self.enabled:
+                    return func(*args)
+                key = self.key(operation, args, version)
+                hit, value = self.get(key)
+                if hit:
+                    return value
+                value = func(*args)
+                self.set(key, value)
+                return value
+            return wrapper
+        return decorator
+
+
+symbolic_cache = SymbolicCache()
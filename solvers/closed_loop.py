@@ -0,0 +1,181 @@
+import numpy as np
+from .imc_tunning import model_polynomials
+from .instrumentation import instrument
+from .step_response_plotting import companion_state_space, zoh_discretize
+
+
+#### fixed-step closed-loop simulation of many IMC-tuned PID loops at once
+def _parameter(value, count, missing=np.nan):
+    if value is None:
+        return np.full(count, missing)
+    return np.broadcast_to(np.asarray(value, dtype=float), (count,)).copy()
+
+
+def _schedule(value, count, t):
+    """
+    A setpoint or disturbance as a (count, n_steps) array: a scalar, a function
+    of the time array, one value per step (n_steps,) or per loop and step.
+    """
+    if callable(value):
+        value = value(t)
+    value = np.asarray(value, dtype=float)
+    if value.ndim == 1:
+        value = value[None, :]
+    return np.broadcast_to(value, (count, t.size))
+
+
+class PIDLoops:
+    """
+    N PID loops in unity feedback, simulated together with a fixed step dt.
+
+    The controller is the PID form of the IMC tuning table,
+    C(s) = k_c (1 + 1/(τ_I s) + τ_D s) / (τ_F s + 1), on the error r - y; a missing
+    (None/NaN) τ_I, τ_D or τ_F drops the term. The controller output is limited to
+    [u_min, u_max], with back-calculation anti-windup: the integrator is corrected
+    by (u - u_unsaturated)/tracking_time. The plants are ZOH-discretized state-space
+    realizations, and each loop's transport delay is a whole number of steps
+    held in a shared ring buffer of controller outputs.
+
+    All state lives in (N, ...) arrays, so one step() advances every loop with a
+    few array operations. Loops are independent: an unstable one diverges to
+    inf/NaN without affecting the rest. Note that an ideal derivative (τ_D without
+    τ_F) on a biproper plant, as in row I, has unbounded loop gain at high
+    frequency, which the one-sample measurement lag of any sampled loop turns unstable.
+
+    Args:
+        nums, dens: plant coefficient lists, highest power first, one per loop
+        k_c, tau_I, tau_D, tau_F: tuning, scalars or one value per loop
+        delays: transport delays in seconds, rounded to whole steps
+        dt: fixed step in seconds
+        u_min, u_max: actuator limits, scalars or per loop (default: unlimited)
+        tracking_time: anti-windup tracking time constant (default: τ_I, or
+            √(τ_I τ_D) with derivative action; unused without integral action)
+    """
+
+    def __init__(self, nums, dens, k_c, tau_I=None, tau_D=None, tau_F=None, delays=0.0, dt=0.01,
+                 u_min=-np.inf, u_max=np.inf, tracking_time=None):
+        A, B, self.C, self.D = companion_state_space(nums, dens)
+        self.count = B.shape[0]
+        self.dt = float(dt)
+        self.Ad, self.Bd = zoh_discretize(A, B, self.dt)
+
+        count = self.count
+        self.k_c = _parameter(k_c, count)
+        tau_I, tau_D, tau_F = (_parameter(v, count) for v in (tau_I, tau_D, tau_F))
+        integral = np.isfinite(tau_I) & (tau_I > 0)
+        self.k_i = np.where(integral, self.k_c / np.where(integral, tau_I, 1.0), 0.0)
+        self.k_d = self.k_c * np.nan_to_num(tau_D)
+        tau_F = np.nan_to_num(tau_F)
+        self.filter_pole = np.where(tau_F > 0, np.exp(-self.dt / np.where(tau_F > 0, tau_F, 1.0)), 0.0)
+        if tracking_time is None:
+            # only integrating loops track; the rest never use it
+            derivative = integral & (self.k_d != 0)
+            tracking_time = np.where(derivative, np.sqrt(np.abs(np.where(derivative, tau_I * tau_D, 1.0))),
+                                     np.where(integral, tau_I, np.inf))
+        tracking_time = _parameter(tracking_time, count)
+        tracks = integral & (tracking_time > 0)
+        self.k_t = np.where(tracks, 1.0 / np.where(tracks, tracking_time, 1.0), 0.0)
+        self.u_min, self.u_max = _parameter(u_min, count), _parameter(u_max, count)
+
+        self.lag = np.rint(_parameter(delays, count, 0.0) / self.dt).astype(int)
+        self.reset()
+
+    @classmethod
+    def from_tuning(cls, tuned, **kwargs):
+        """
+        Loops from the output of batch_identify_and_calculate_params, each with its
+        process model as the plant; rows without a model type are dropped.
+        Remaining keyword arguments go to PIDLoops (delays, dt, limits, ...).
+        """
+        tuned = tuned[tuned['model_type'].notna()]
+        plants = [model_polynomials(eq) for eq in tuned['model']]
+        return cls([num for num, _ in plants], [den for _, den in plants],
+                   tuned['k_c'].to_numpy(), tuned['τ_I'].to_numpy(), tuned['τ_D'].to_numpy(),
+                   tuned['τ_F'].to_numpy(), **kwargs)
+
+    def reset(self):
+        """Puts every loop back at rest: zero plant state, controller state and delay line."""
+        count = self.count
+        self.x = np.zeros(self.Bd.shape)
+        self.integral = np.zeros(count)
+        self.filtered = np.zeros(count)
+        self.previous_error = np.zeros(count)
+        self.held = np.zeros(count)
+        self.buffer = np.zeros((count, int(self.lag.max()) + 1))
+        self.position = 0
+        self.rows = np.arange(count)
+        self.time = 0.0
+
+    def step(self, setpoint=1.0, disturbance=0.0):
+        """
+        Advances every loop by dt.
+
+        Args:
+            setpoint: r at this step, scalar or per loop
+            disturbance: load disturbance added to the plant input, scalar or per loop
+
+        Returns:
+            (y, u): measurement at the start of the step and saturated controller output
+        """
+        y = np.einsum('ij,ij->i', self.C, self.x) + self.D * self.held
+        error = setpoint - y
+        unsaturated = self.k_c * error + self.integral + self.k_d * (error - self.previous_error) / self.dt
+        self.filtered = self.filter_pole * self.filtered + (1.0 - self.filter_pole) * unsaturated
+        u = np.clip(self.filtered, self.u_min, self.u_max)
+        self.integral += self.dt * (self.k_i * error + self.k_t * (u - self.filtered))
+        self.previous_error = error
+
+        # delay line: write u now, read the output written `lag` steps ago
+        size = self.buffer.shape[1]
+        self.buffer[:, self.position] = u
+        self.held = self.buffer[self.rows, (self.position - self.lag) % size] + disturbance
+        self.position = (self.position + 1) % size
+
+        self.x = np.einsum('ijk,ik->ij', self.Ad, self.x) + self.Bd * self.held[:, None]
+        self.time += self.dt
+        return y, u
+
+    @instrument(size=lambda self, *args, **kwargs: self.count)
+    def run(self, t_final, setpoint=1.0, disturbance=0.0):
+        """
+        Simulates every loop from its current state over t_final seconds.
+
+        Args:
+            t_final: horizon in seconds
+            setpoint, disturbance: scalars, functions of the time array, (n_steps,)
+                arrays shared by all loops, or (N, n_steps) arrays, e.g.
+                disturbance=lambda t: np.where(t >= 50, 0.5, 0.0)
+
+        Returns:
+            A dictionary with t (n_steps,), y and u (N, n_steps), setpoint and
+            disturbance (N, n_steps); the loops keep their final state, so a
+            further run() continues the simulation
+        """
+        n_steps = int(round(t_final / self.dt)) + 1
+        t = self.time + self.dt * np.arange(n_steps)
+        r = _schedule(setpoint, self.count, t)
+        d = _schedule(disturbance, self.count, t)
+        y = np.empty((self.count, n_steps))
+        u = np.empty((self.count, n_steps))
+        with np.errstate(over='ignore', invalid='ignore'):
+            for k in range(n_steps):
+                y[:, k], u[:, k] = self.step(r[:, k], d[:, k])
+        return {'t': t, 'y': y, 'u': u, 'setpoint': r, 'disturbance': d}
+
+
+def simulate_loops(nums, dens, k_c, tau_I=None, tau_D=None, tau_F=None, t_final=100.0, dt=0.01,
+                   setpoint=1.0, disturbance=0.0, **kwargs):
+    """
+    One-call closed-loop simulation of N PID loops; see PIDLoops for the model and
+    the remaining keyword arguments (delays, u_min, u_max, tracking_time) and
+    PIDLoops.run for the scenario arguments and the returned arrays.
+    """
+    loops = PIDLoops(nums, dens, k_c, tau_I, tau_D, tau_F, dt=dt, **kwargs)
+    return loops.run(t_final, setpoint, disturbance)
+
+
+#### how to use
+# tuned = batch_identify_and_calculate_params("loops.csv")
+# loops = PIDLoops.from_tuning(tuned, delays=0.5, dt=0.01, u_min=0, u_max=2)
+# run = loops.run(200, setpoint=1.0, disturbance=lambda t: np.where(t >= 100, -0.3, 0.0))
+# step_metrics(run['t'], run['y'][:, :10000])     ####### setpoint part only
@@ -0,0 +1,296 @@
+import functools
+
+import numpy as np
+from ._lazy import lazy_import
+from .instrumentation import instrument
+from .step_response_plotting import companion_state_space, state_space_step_responses
+
+linalg = lazy_import("scipy.linalg")
+
+#### relative size below which a Krylov direction counts as cancelled
+MINIMAL_TOL = 1e-9
+
+
+#### block diagrams composed in state space
+class Block:
+    """
+    A single-input single-output block in state-space form,
+    x' = A x + B u, y = C x + D u, with A (n, n), B (n,), C (n,) and D a float.
+
+    Blocks are immutable and hashable by value, so composed diagrams are cached:
+    `a * b` is the series connection (b after a), `a + b` the parallel sum,
+    `a - b` and `-a` change signs and a.feedback(h) closes a loop around a.
+    Every composition is reduced to a minimal realization (see minimal), so
+    cancelled pole-zero pairs do not pile up as the diagram grows.
+    """
+    __slots__ = ('A', 'B', 'C', 'D', '_key')
+
+    def __init__(self, A, B, C, D=0.0):
+        A, B, C = (np.array(m, dtype=float) for m in (A, B, C))
+        n = B.size
+        self.A, self.B, self.C = A.reshape(n, n), B.reshape(n), C.reshape(n)
+        for m in (self.A, self.B, self.C):
+            m.flags.writeable = False
+        self.D = float(D)
+        self._key = None
+
+    @classmethod
+    def gain(cls, k):
+        """A static gain k, without states."""
+        return cls(np.zeros((0, 0)), np.zeros(0), np.zeros(0), k)
+
+    @classmethod
+    def from_tf(cls, num, den):
+        """The minimal realization of num/den (coefficients, highest power first)."""
+        return _tf_block(tuple(np.atleast_1d(np.asarray(num, dtype=float))),
+                         tuple(np.atleast_1d(np.asarray(den, dtype=float))))
+
+    @property
+    def order(self):
+        return self.B.size
+
+    def _identity(self):
+        if self._key is None:
+            self._key = (self.order, self.A.tobytes(), self.B.tobytes(), self.C.tobytes(), self.D)
+        return self._key
+
+    def __hash__(self):
+        return hash(self._identity())
+
+    def __eq__(self, other):
+        return isinstance(other, Block) and self._identity() == other._identity()
+
+    def __mul__(self, other):
+        return series(self, other)
+
+    def __rmul__(self, other):
+        return series(other, self)
+
+    def __add__(self, other):
+        return parallel(self, other)
+
+    def __radd__(self, other):
+        return parallel(other, self)
+
+    def __neg__(self):
+        return Block(self.A, self.B, -self.C, -self.D)
+
+    def __sub__(self, other):
+        return parallel(self, -as_block(other))
+
+    def __rsub__(self, other):
+        return parallel(other, -self)
+
+    def feedback(self, other=1.0, sign=-1):
+        return feedback_loop(self, other, sign)
+
+    def minimal(self, tol=MINIMAL_TOL):
+        """
+        Minimal realization: the part of the block that is both controllable and
+        observable, i.e. the transfer function with every cancelling pole-zero
+        pair removed. The reachable subspace of (A, B) and then the observable one
+        of (A', C') are built by Arnoldi iterations with orthonormal bases; a new
+        direction smaller than tol·‖A‖ ends the subspace.
+        """
+        return _minimal(self, tol)
+
+    def poles(self):
+        return np.linalg.eigvals(self.A) if self.order else np.zeros(0, dtype=complex)
+
+    def zeros(self):
+        """Finite transmission zeros, from the generalized eigenvalues of the system pencil."""
+        n = self.order
+        if n == 0:
+            return np.zeros(0, dtype=complex)
+        pencil = np.zeros((n + 1, n + 1))
+        pencil[:n, :n], pencil[:n, n], pencil[n, :n], pencil[n, n] = self.A, self.B, self.C, self.D
+        identity = np.zeros((n + 1, n + 1))
+        identity[:n, :n] = np.eye(n)
+        values = linalg.eigvals(pencil, identity)
+        return values[np.isfinite(values)]
+
+    def transfer_function(self):
+        """
+        (num, den) coefficient arrays, highest power first: den from the poles and
+        num from the transmission zeros, scaled to G at a point clear of both.
+        Coefficients of high-order systems are ill-conditioned however they are
+        formed, so analysis should use frequency_response, step_response, poles
+        and zeros on the Block itself.
+        """
+        if self.order == 0:
+            return np.array([self.D]), np.array([1.0])
+        poles, zeros = self.poles(), self.zeros()
+        den, num = (np.atleast_1d(np.real(np.poly(roots))) for roots in (poles, zeros))
+        # on the imaginary axis, beyond every pole and zero
+        w0 = 1.0 + np.max(np.abs(poles)) + np.max(np.abs(zeros), initial=0.0)
+        gain = self.frequency_response(w0) * np.polyval(den, 1j * w0) / np.polyval(num, 1j * w0)
+        if abs(gain) == 0.0:
+            return np.zeros(1), den
+        return gain.real * num, den
+
+    def step_response(self, t_final=None, n_samples=None):
+        """Step response t, y (n_samples,) simulated from A, B, C, D (see state_space_step_responses)."""
+        t, y = state_space_step_responses(self.A[None], self.B[None], self.C[None], [self.D], t_final, n_samples)
+        return t[0], y[0]
+
+    def frequency_response(self, omega):
+        """G(jω) = C (jωI - A)^-1 B + D on an ω array, from one batched solve."""
+        omega = np.asarray(omega, dtype=float)
+        if self.order == 0:
+            return np.full(omega.shape, self.D, dtype=complex)
+        pencil = 1j * omega.reshape(-1, 1, 1) * np.eye(self.order) - self.A
+        states = np.linalg.solve(pencil, np.broadcast_to(self.B, (omega.size, self.order))[..., None])[..., 0]
+        return (states @ self.C + self.D).reshape(omega.shape)
+
+    def __repr__(self):
+        return f"Block(order={self.order}, D={self.D})"
+
+
+def as_block(system):
+    """
+    A Block from a Block, a scalar gain, a (num, den) pair of coefficient lists
+    or a ctrl.TransferFunction.
+    """
+    if isinstance(system, Block):
+        return system
+    if np.isscalar(system):
+        return Block.gain(system)
+    if hasattr(system, 'num') and hasattr(system, 'den'):
+        return Block.from_tf(system.num[0][0], system.den[0][0])
+    num, den = system
+    return Block.from_tf(num, den)
+
+
+@functools.lru_cache(maxsize=512)
+def _tf_block(num, den):
+    A, B, C, D = companion_state_space([num], [den])
+    return _minimal(Block(A[0], B[0], C[0], D[0]), MINIMAL_TOL)
+
+
+def _krylov_basis(A, v, tol):
+    """Orthonormal basis (n, r) of span{v, Av, A²v, ...}, by Arnoldi with reorthogonalization."""
+    n = v.size
+    basis = np.zeros((n, n))
+    r = 0
+    if not v.any():
+        return basis[:, :0]
+    v = v / np.linalg.norm(v)
+    limit = tol * np.linalg.norm(A)
+    while r < n:
+        for _ in range(2):
+            v = v - basis[:, :r] @ (basis[:, :r].T @ v)
+        norm = np.linalg.norm(v)
+        if norm <= limit or norm == 0.0:
+            break
+        basis[:, r] = v / norm
+        v = A @ basis[:, r]
+        r += 1
+    return basis[:, :r]
+
+
+@functools.lru_cache(maxsize=512)
+def _minimal(block, tol):
+    if block.order == 0:
+        return block
+    # diagonal similarity first, so that ‖A‖ measures every state on the same scale
+    A, T = linalg.matrix_balance(block.A, permute=False, separate=True)
+    scale = T[0]
+    B, C = block.B / scale, block.C * scale
+
+    V = _krylov_basis(A, B, tol)
+    A, B, C = V.T @ A @ V, V.T @ B, C @ V
+    if B.size:
+        W = _krylov_basis(A.T, C, tol)
+        A, B, C = W.T @ A @ W, W.T @ B, C @ W
+    if B.size == block.order:
+        return block
+    return Block(A, B, C, block.D)
+
+
+#### pairwise connections; n-way compositions fold over them, so every sub-diagram is cached
+@functools.lru_cache(maxsize=512)
+def _series_pair(first, second, tol):
+    n1, n2 = first.order, second.order
+    A = np.zeros((n1 + n2, n1 + n2))
+    A[:n1, :n1] = first.A
+    A[n1:, :n1] = np.outer(second.B, first.C)
+    A[n1:, n1:] = second.A
+    B = np.concatenate([first.B, second.B * first.D])
+    C = np.concatenate([second.D * first.C, second.C])
+    return _minimal(Block(A, B, C, second.D * first.D), tol)
+
+
+@functools.lru_cache(maxsize=512)
+def _parallel_pair(first, second, tol):
+    n1, n2 = first.order, second.order
+    A = np.zeros((n1 + n2, n1 + n2))
+    A[:n1, :n1] = first.A
+    A[n1:, n1:] = second.A
+    B = np.concatenate([first.B, second.B])
+    C = np.concatenate([first.C, second.C])
+    return _minimal(Block(A, B, C, first.D + second.D), tol)
+
+
+@functools.lru_cache(maxsize=512)
+def _feedback_pair(forward, backward, sign, tol):
+    # u = r + sign·z, y = G u, z = H y, with algebraic loops through D_G·D_H
+    loop = 1.0 - sign * forward.D * backward.D
+    if abs(loop) < 1e-12:
+        raise ValueError("ill-posed feedback loop: 1 - sign·D_forward·D_backward is zero")
+    f = 1.0 / loop
+    n1, n2 = forward.order, backward.order
+    # u = f (r + sign D_H C_G x1 + sign C_H x2)
+    u_x = f * sign * np.concatenate([backward.D * forward.C, backward.C])
+    y_x = np.concatenate([forward.C, np.zeros(n2)]) + forward.D * u_x
+    A = np.zeros((n1 + n2, n1 + n2))
+    A[:n1, :n1] = forward.A
+    A[n1:, n1:] = backward.A
+    A[:n1] += np.outer(forward.B, u_x)
+    A[n1:] += np.outer(backward.B, y_x)
+    B = np.concatenate([forward.B * f, backward.B * forward.D * f])
+    return _minimal(Block(A, B, y_x, forward.D * f), tol)
+
+
+@instrument(size=lambda *systems, **kwargs: len(systems))
+def series(*systems, tol=MINIMAL_TOL):
+    """
+    Cascade of any number of blocks, signal flowing from the first to the last:
+    G = G_n ··· G_2 G_1. Systems are Blocks, gains, (num, den) pairs or
+    ctrl.TransferFunctions; the result is a minimal Block.
+    """
+    if not systems:
+        return Block.gain(1.0)
+    return functools.reduce(lambda a, b: _series_pair(a, b, tol), map(as_block, systems))
+
+
+@instrument(size=lambda *systems, **kwargs: len(systems))
+def parallel(*systems, tol=MINIMAL_TOL):
+    """Sum of any number of blocks driven by the same input: G = G_1 + G_2 + ... + G_n, minimal."""
+    if not systems:
+        return Block.gain(0.0)
+    return functools.reduce(lambda a, b: _parallel_pair(a, b, tol), map(as_block, systems))
+
+
+@instrument()
+def feedback_loop(forward, backward=1.0, sign=-1, tol=MINIMAL_TOL):
+    """
+    Closed loop G/(1 - sign·G H) of a forward path G and a feedback path H
+    (negative feedback by default), minimal. Either path may itself be a
+    composed Block, e.g. feedback_loop(series(C, G), sensor).
+    """
+    return _feedback_pair(as_block(forward), as_block(backward), int(np.sign(sign)) or -1, tol)
+
+
+def clear_composition_cache():
+    """Drops the cached realizations and compositions."""
+    for cached in (_tf_block, _minimal, _series_pair, _parallel_pair, _feedback_pair):
+        cached.cache_clear()
+
+
+#### how to use
+# plant = series(([1], [5, 1]), ([1], [1, 1]))                  ##### two lags in series
+# loop = feedback_loop(series(([2, 1], [1, 0]), plant))          ##### PI controller, unity feedback
+# loop.transfer_function()                                       ##### (num, den) of the closed loop
+# t, y = loop.step_response()                                    ##### simulated from the realization
+# (plant + ([1], [1, 1])).order                                  ##### shared (s+1) pole kept once: 2
+# bode_plot(*feedback_loop(plant, ([1], [0.1, 1])).transfer_function())
@@ -0,0 +1,23 @@
+import functools
+
+from ._lazy import lazy_import
+
+ctrl = lazy_import("control")
+
+
+#### Padé approximations of e^(-delay s), computed once per (delay, order)
+@functools.lru_cache(maxsize=512)
+def pade(delay, order=8):
+    """
+    Cached Padé approximation of a pure time delay.
+
+    Only needed where a rational model is required (time simulation); frequency
+    analysis applies the exact factor e^(-jωθ) instead, see frequency_response.
+
+    Returns:
+        (num, den) coefficient tuples, highest power first
+    """
+    if delay == 0:
+        return (1.0,), (1.0,)
+    num, den = ctrl.pade(float(delay), order)
+    return tuple(float(c) for c in num), tuple(float(c) for c in den)
@@ -1,23 +1,119 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import control as ctrl 
-import sympy as sp
+from ._lazy import lazy_import
+from .instrumentation import instrument, stage
+from .polynomials import batch_roots, polymul_batch, stack_pair
+from .results import FeedbackResult, StabilityMap
+
+ctrl = lazy_import("control")
 
 #### feedback system
-def feedback(c_s, g_s):
+@instrument()
+def feedback(c_s, g_s, verbose=True):
     """
     This function calculates the feedback system of a given transfer function. 
     The feedback system is defined as G(s) / (1 + G(S)H(s)), where G(s) is the transfer function and H(s) is the feedback system. 
+    Returns a FeedbackResult (coefficients and TransferFunction), printed unless verbose=False.
+    """
+
+    with stage("control.TransferFunction"):
+        c_s = ctrl.TransferFunction(c_s[0], c_s[1])
+        g_s = ctrl.TransferFunction(g_s[0], g_s[1])
+
+    with stage("control.feedback"):
+        feedback_system = ctrl.feedback(c_s*g_s)
+    result = FeedbackResult(np.asarray(feedback_system.num[0][0]), np.asarray(feedback_system.den[0][0]), feedback_system)
+    return result.show() if verbose else result
+
+
+#### PID controller coefficients for arrays of tuning parameters
+def pid_controller(k_c, tau_I=None, tau_D=None, tau_F=None):
+    """
+    Coefficients of C(s) = k_c (1 + 1/(τ_I s) + τ_D s) / (τ_F s + 1), the PID form
+    of the IMC tuning table, for broadcastable parameter arrays.
+
+    None or NaN means the term is absent: no integral action without τ_I,
+    no derivative without τ_D, no filter without τ_F.
+
+    Returns:
+        (num, den): lists of three arrays each, highest power first
+    """
+    k_c = np.asarray(k_c, dtype=float)
+    tau_I, tau_D, tau_F = (np.full_like(k_c, np.nan) if v is None else np.asarray(v, dtype=float)
+                           for v in (tau_I, tau_D, tau_F))
+    tau_D = np.nan_to_num(tau_D)
+    tau_F = np.nan_to_num(tau_F)
+    integral = ~np.isnan(tau_I)
+    tau_I = np.where(integral, tau_I, 1.0)
+    zero = np.zeros(np.broadcast_shapes(k_c.shape, tau_I.shape, tau_D.shape, tau_F.shape))
+
+    # with integral: k_c(τ_I τ_D s² + τ_I s + 1) / (τ_I τ_F s² + τ_I s)
+    # without:       k_c(τ_D s + 1) / (τ_F s + 1)
+    num = [np.where(integral, k_c * tau_I * tau_D, zero),
+           np.where(integral, k_c * tau_I, k_c * tau_D),
+           k_c + zero]
+    den = [np.where(integral, tau_I * tau_F, zero),
+           np.where(integral, tau_I, tau_F),
+           np.where(integral, zero, 1.0)]
+    return num, den
+
+
+#### closed-loop stability over a grid of controller parameters
+def _coefficient_rows(coeffs, shape):
+    return np.stack([np.broadcast_to(np.asarray(c, dtype=float), shape).ravel() for c in coeffs], axis=1)
+
+
+@instrument(size=lambda controller, g_s, *params, **kwargs: np.prod([np.size(p) for p in params]))
+def stability_map(controller, g_s, *params, chunk_size=50000):
     """
+    Closed-loop stability of C(s)G(s) in unity feedback over a grid of one or two
+    controller parameters, without building any TransferFunction objects.
 
-    c_s = ctrl.TransferFunction(c_s[0], c_s[1])
-    g_s = ctrl.TransferFunction(g_s[0], g_s[1])
+    The characteristic polynomials Dc·Dg + Nc·Ng of all grid points are formed with
+    broadcasting and their roots come from batched companion-matrix eigenvalues.
 
-    feedback_system = ctrl.feedback(c_s*g_s)
-    return print(f"feedback system :{feedback_system}") 
+    Args:
+        controller: function of the parameter grids returning (num, den) coefficient
+            lists of C(s), e.g. lambda k_c, tau_I: pid_controller(k_c, tau_I)
+        g_s: [num, den] of the process, as for feedback()
+        *params: one or two 1-D arrays of parameter values spanning the grid
+        chunk_size: grid points per eigenvalue batch, bounds memory use
+
+    Returns:
+        A StabilityMap with
+        - grid: the parameter grids (np.meshgrid, ij indexing)
+        - stable: True where every closed-loop pole has a negative real part
+        - spectral_abscissa: largest real part of the closed-loop poles
+        - damping: smallest damping ratio -Re(p)/|p| of the closed-loop poles
+    """
+    grid = np.meshgrid(*(np.asarray(p, dtype=float) for p in params), indexing='ij')
+    shape = grid[0].shape
+    c_num, c_den = controller(*grid)
+    c_num, c_den = stack_pair(_coefficient_rows(c_num, shape), _coefficient_rows(c_den, shape))
+    g_num, g_den = stack_pair([g_s[0]], [g_s[1]])
+
+    abscissa = np.empty(c_num.shape[0])
+    damping = np.empty(c_num.shape[0])
+    for start in range(0, c_num.shape[0], chunk_size):
+        part = slice(start, start + chunk_size)
+        characteristic = polymul_batch(c_den[part], g_den) + polymul_batch(c_num[part], g_num)
+        poles = batch_roots(characteristic)
+        magnitude = np.abs(poles)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            zeta = np.where(magnitude > 0, -poles.real / magnitude, 0.0)
+        abscissa[part] = np.nanmax(np.where(np.isnan(poles), -np.inf, poles.real), axis=1)
+        damping[part] = np.nanmin(np.where(np.isnan(poles), np.inf, zeta), axis=1)
+
+    abscissa = abscissa.reshape(shape)
+    return StabilityMap(grid, abscissa < 0, abscissa, damping.reshape(shape))
 
 
 #### how to use 
-c_s = [[1,1,1],[1]] #*-3
-g_s = [[-3],[1,1.5,-2.5,-3]]  #(s+1)(s+2)(s-1.5)
-feedback(c_s,g_s)
\ No newline at end of file
+# k_c = np.linspace(0.01, 5, 400)
+# tau_I = np.linspace(0.1, 20, 250)
+# g_s = [[1], [1, 3, 3, 1]]
+# region = stability_map(lambda k, ti: pid_controller(k, ti), g_s, k_c, tau_I)
+
+if __name__ == "__main__":
+    c_s = [[1,1,1],[1]] #*-3
+    g_s = [[-3],[1,1.5,-2.5,-3]]  #(s+1)(s+2)(s-1.5)
+    feedback(c_s,g_s)
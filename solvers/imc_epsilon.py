@@ -0,0 +1,182 @@
+import numpy as np
+from ._lazy import lazy_import
+from .bode_diagrams import frequency_margins
+from .feedback import pid_controller
+from .imc_tuning_table import PID_COLUMNS
+from .imc_tunning import (_PARAMETER_NAMES, batch_identify_and_calculate_params, imc_pid_params,
+                          model_polynomials)
+from .instrumentation import instrument
+from .polynomials import batch_roots, polymul_batch, polyval_batch, stack_pair
+from .step_metrics import step_metrics
+from .step_response_plotting import step_horizon, step_responses
+
+pd = lazy_import("pandas")
+
+OBJECTIVES = ('iae', 'overshoot', 'phase_margin', 'ms')
+
+
+#### candidate controllers: every identified loop against every ϵ of the grid
+def _candidates(tuned, epsilons):
+    """
+    Evaluates the tuning rules of each model class once on a (loops, ϵ) grid.
+
+    Returns:
+        loop index, ϵ and k_c, τ_I, τ_D, τ_F per candidate, as flat arrays
+    """
+    loops, eps, pid = [], [], {name: [] for name in PID_COLUMNS}
+    for model_type, group in tuned.groupby('model_type', sort=False):
+        params = {name: group[name].to_numpy()[:, None] for name in _PARAMETER_NAMES if name in group}
+        values = imc_pid_params(model_type, params, epsilons[None, :])
+        shape = (len(group), epsilons.size)
+        loops.append(np.broadcast_to(group.index.to_numpy()[:, None], shape).ravel())
+        eps.append(np.broadcast_to(epsilons[None, :], shape).ravel())
+        for name in PID_COLUMNS:
+            pid[name].append(np.broadcast_to(values[name], shape).ravel())
+    return (np.concatenate(loops), np.concatenate(eps),
+            {name: np.concatenate(values) for name, values in pid.items()})
+
+
+def _frequency_metrics(c_num, c_den, plant_response, position, stable, omega, chunk_size):
+    """
+    Phase margin and maximum sensitivity of the open loops C·G; NaN for unstable
+    candidates. G(jω) is evaluated once per loop (plant_response, indexed by
+    position), so only the second-order controllers are evaluated per candidate.
+    """
+    phase_margin = np.full(stable.size, np.nan)
+    ms = np.full(stable.size, np.nan)
+    jw = 1j * omega
+    for start in range(0, stable.size, chunk_size):
+        part = slice(start, start + chunk_size)
+        response = polyval_batch(c_num[part], jw) / polyval_batch(c_den[part], jw) * plant_response[position[part]]
+        magnitude = 20 * np.log10(np.abs(response))
+        phase = np.degrees(np.unwrap(np.angle(response), axis=1))
+        phase_margin[part] = frequency_margins(omega, magnitude, phase).phase_margin
+        ms[part] = np.max(1 / np.abs(1 + response), axis=1)
+    # no gain crossover: |L| < 1 throughout, nothing to lose in phase
+    phase_margin = np.where(np.isnan(phase_margin), 180.0, phase_margin)
+    return np.where(stable, phase_margin, np.nan), np.where(stable, ms, np.nan)
+
+
+def _time_metrics(num, den, loops, stable, n_samples, chunk_size):
+    """IAE and overshoot of the closed-loop setpoint steps; NaN for unstable candidates."""
+    iae = np.full(loops.size, np.nan)
+    overshoot = np.full(loops.size, np.nan)
+    rows = np.flatnonzero(stable)
+    if rows.size == 0:
+        return iae, overshoot
+    # one horizon per loop, the longest over its candidates, so their IAEs compare
+    t_final, _ = step_horizon(den[rows])
+    horizon = pd.Series(t_final).groupby(loops[rows]).transform('max').to_numpy()
+    for start in range(0, rows.size, chunk_size):
+        part = slice(start, start + chunk_size)
+        t, y = step_responses(num[rows[part]], den[rows[part]], t_final=horizon[part], n_samples=n_samples)
+        metrics = step_metrics(t, y)
+        iae[rows[part]] = metrics['iae'].to_numpy()
+        overshoot[rows[part]] = metrics['overshoot'].to_numpy()
+    return iae, overshoot
+
+
+def _pareto_front(scores, loops, rtol=1e-9, atol=1e-9):
+    """
+    True for the candidates no other candidate of the same loop dominates
+    (at least as good in every objective, better in one); scores are minimized.
+    Objectives within atol + rtol·|score| of each other count as equal, so
+    round-off (an overshoot of 2e-14 against 0) decides nothing.
+    """
+    front = np.zeros(loops.size, dtype=bool)
+    for loop in np.unique(loops):
+        idx = np.flatnonzero(loops == loop)
+        s = scores[idx]
+        valid = np.all(np.isfinite(s), axis=1)
+        a, b = s[:, None, :], s[None, :, :]
+        with np.errstate(invalid='ignore'):
+            tol = atol + rtol * np.maximum(np.abs(a), np.abs(b))
+            no_worse = np.all(a <= b + tol, axis=2)
+            better = np.any(a < b - tol, axis=2)
+        dominated = np.any(no_worse & better & valid[:, None], axis=0)
+        front[idx] = valid & ~dominated
+    return front
+
+
+@instrument(size=lambda models, *args, **kwargs: len(models) if not isinstance(models, str) else None)
+def optimize_epsilon(models, epsilons=None, epsilon=1.0, omega=None, n_samples=1000, chunk_size=2000,
+                     all_candidates=False, model_column='model', epsilon_column='epsilon'):
+    """
+    Sweeps the IMC filter constant ϵ for many loops and keeps the Pareto-optimal
+    choices between speed and robustness.
+
+    Each loop is identified once (batch_identify_and_calculate_params, with
+    `epsilon` as for that function), its tuning rules are evaluated on the whole
+    ϵ grid in one array evaluation, and the PID + filter controller of the table
+    (see pid_controller) is closed around the process model in unity feedback.
+    Every candidate is scored in batch on
+    - iae and overshoot (%) of the closed-loop setpoint step (batched ZOH simulation)
+    - phase_margin (degrees) and ms, the maximum sensitivity max|1/(1 + CG)|, on
+      the frequency grid
+    Unstable candidates (from the closed-loop poles) get NaN scores and are never
+    Pareto-optimal. Loops that match no model are left out.
+
+    Args:
+        models: equation strings, a CSV path or a DataFrame, as for the batch tuner
+        epsilons: ϵ values to try (default: np.geomspace(0.05, 20, 40))
+        epsilon: ϵ used to identify the models (rows K, M and N depend on it)
+        omega: frequency grid in rad/s (default: np.logspace(-3, 3, 600))
+        n_samples: samples per step response
+        chunk_size: candidates evaluated together, bounds memory use
+        all_candidates: return every candidate with its pareto flag instead of the front only
+        model_column, epsilon_column: as for batch_identify_and_calculate_params
+
+    Returns:
+        A DataFrame with one row per (loop, ϵ) on each loop's Pareto front and the
+        columns loop (row of the input), model, model_type, epsilon, k_c, τ_I, τ_D,
+        τ_F, iae, overshoot, phase_margin, ms, stable, pareto
+    """
+    epsilons = np.geomspace(0.05, 20, 40) if epsilons is None else np.asarray(epsilons, dtype=float).ravel()
+    omega = np.logspace(-3, 3, 600) if omega is None else np.asarray(omega, dtype=float)
+
+    tuned = batch_identify_and_calculate_params(models, epsilon, model_column, epsilon_column)
+    tuned = tuned[tuned['model_type'].notna()]
+    columns = ['loop', 'model', 'model_type', 'epsilon', *PID_COLUMNS, *OBJECTIVES, 'stable', 'pareto']
+    if tuned.empty:
+        return pd.DataFrame(columns=columns)
+
+    loops, eps, pid = _candidates(tuned, epsilons)
+    plants = [model_polynomials(eq) for eq in tuned['model']]
+    g_num, g_den = stack_pair([num for num, _ in plants], [den for _, den in plants])
+    position = tuned.index.get_indexer(loops)
+    c_num, c_den = pid_controller(pid['k_c'], pid['τ_I'], pid['τ_D'], pid['τ_F'])
+    c_num, c_den = np.stack(c_num, axis=1), np.stack(c_den, axis=1)
+
+    # open loop L = CG, closed loop CG/(1 + CG) over the characteristic polynomial
+    l_num, l_den = polymul_batch(c_num, g_num[position]), polymul_batch(c_den, g_den[position])
+    characteristic = l_den + l_num
+    poles = batch_roots(characteristic)
+    stable = np.nanmax(np.where(np.isnan(poles), -np.inf, poles.real), axis=1) < 0
+
+    plant_response = polyval_batch(g_num, 1j * omega) / polyval_batch(g_den, 1j * omega)
+    phase_margin, ms = _frequency_metrics(c_num, c_den, plant_response, position, stable, omega, chunk_size)
+    iae, overshoot = _time_metrics(l_num, characteristic, loops, stable, n_samples, chunk_size)
+
+    scores = np.column_stack([iae, overshoot, -phase_margin, ms])
+    frame = pd.DataFrame({
+        'loop': loops,
+        'model': tuned['model'].loc[loops].to_numpy(),
+        'model_type': tuned['model_type'].loc[loops].to_numpy(),
+        'epsilon': eps,
+        **pid,
+        'iae': iae,
+        'overshoot': overshoot,
+        'phase_margin': phase_margin,
+        'ms': ms,
+        'stable': stable,
+        'pareto': _pareto_front(scores, loops),
+    }, columns=columns)
+    if not all_candidates:
+        frame = frame[frame['pareto']].reset_index(drop=True)
+    return frame
+
+
+#### how to use
+# front = optimize_epsilon(["2/(5s+1)", "2(-3s+1)/(5s+1)", "2/(s(5s+1))"])
+# front[front.loop == 1].sort_values('iae')        ######## fastest to most robust for loop 1
+# front[front.ms <= 1.6].groupby('loop').first()   ######## fastest ϵ with Ms below 1.6
@@ -1,8 +1,5 @@
-import numpy as np
-import matplotlib.pyplot as plt
-import control as ctrl 
-import sympy as sp
-import pandas as pd
+import functools
+import re
 
 # Define the IMC-based PID tuning table
 imc_pid_table = {
@@ -126,3 +123,61 @@ imc_pid_table = {
 # print(df_imc_pid)
 
 
+#### the tuning columns compiled into functions of (parameters, epsilon)
+PID_COLUMNS = ("k_c", "τ_I", "τ_D", "τ_F")
+
+_FORMULA_TOKEN = re.compile(r"\s*(?:(\d+(?:\.\d*)?)|(τ₁|τ₂|[kτζβϵ])|(²)|([()+\-*/]))")
+_IDENTIFIERS = {'k': 'k', 'τ': 'tau', 'τ₁': 'tau_1', 'τ₂': 'tau_2', 'ζ': 'zeta', 'β': 'beta', 'ϵ': 'epsilon'}
+
+
+def compile_formula(text):
+    """
+    Compiles one formula of the table, e.g. "(2ϵ + τ)/(kϵ²)", into a function
+    f(parameters, epsilon) of the model parameters (keyed 'k', 'τ', 'τ₁', 'τ₂',
+    'ζ', 'β') and ϵ. Juxtaposition is multiplication and ² squares; floats and
+    NumPy arrays evaluate alike. "-" compiles to a function returning None.
+    """
+    text = text.strip()
+    if text == "-":
+        return lambda parameters, epsilon: None
+    source, symbols = [], []
+    operand_end = False
+    pos = 0
+    while pos < len(text):
+        match = _FORMULA_TOKEN.match(text, pos)
+        if match is None:
+            raise ValueError(f"unexpected character {text[pos]!r} in formula {text!r}")
+        pos = match.end()
+        number, symbol, square, operator = match.groups()
+        starts_operand = number is not None or symbol is not None or operator == "("
+        if operand_end and starts_operand:
+            source.append("*")
+        if number is not None:
+            source.append(number)
+        elif symbol is not None:
+            source.append(_IDENTIFIERS[symbol])
+            if symbol not in symbols and symbol != 'ϵ':
+                symbols.append(symbol)
+        elif square is not None:
+            source.append("**2")
+        else:
+            source.append(operator)
+        operand_end = number is not None or symbol is not None or square is not None or operator == ")"
+    code = compile(" ".join(source), text, "eval")
+
+    def formula(parameters, epsilon):
+        namespace = {_IDENTIFIERS[symbol]: parameters[symbol] for symbol in symbols}
+        namespace['epsilon'] = epsilon
+        return eval(code, {'__builtins__': {}}, namespace)
+    formula.__doc__ = text
+    return formula
+
+
+@functools.lru_cache(maxsize=None)
+def tuning_rules():
+    """
+    imc_pid_table compiled once: model -> (k_c, τ_I, τ_D, τ_F) formulas, each a
+    function of (parameters, epsilon) as returned by compile_formula.
+    """
+    return {model: tuple(compile_formula(imc_pid_table[column][row]) for column in PID_COLUMNS)
+            for row, model in enumerate(imc_pid_table["Model"])}
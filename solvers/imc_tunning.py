@@ -1,11 +1,371 @@
-import numpy as np
-import control as ct
-import pandas as pd
-import sympy as sp
-from sympy.abc import s
-from imc_tuning_table import *
+import math
 import re
 
+import numpy as np
+from ._lazy import lazy_import
+from .imc_tuning_table import PID_COLUMNS, imc_pid_table, tuning_rules
+from .instrumentation import instrument
+
+pd = lazy_import("pandas")
+
+#### PID formulas per model come from imc_pid_table, compiled once by tuning_rules():
+#### (parameters, epsilon) -> (k_c, τ_I, τ_D, τ_F); floats or numpy arrays of equal length
+def _pid_formulas(model_type, params, epsilon):
+    return tuple(formula(params, epsilon) for formula in tuning_rules()[model_type])
+
+
+_MODEL_COMMENTS = {
+    "A": "First-order process",
+    "B": "Second-order process (two time constants)",
+    "C": "Second-order underdamped process",
+    "D": "First-order with RHP zero (β > 0)",
+    "E": "First-order with RHP zero and matching pole (β > 0)",
+    "F": "Second-order underdamped with RHP zero (β > 0)",
+    "G": "Second-order underdamped with RHP zero and matching pole (β > 0)",
+    "H": "Integrator process",
+    "I": "Integrator with lead",
+    "J": "Integrator with first-order lag",
+    "K": "Complex integrator process",
+    "L": "Integrator with RHP zero (β > 0)",
+    "M": "First-order with RHP zero and ϵ filter (β > 0)",
+    "N": "Complex dynamics with RHP zero (β > 0)",
+}
+
+_PARAMETER_NAMES = ['k', 'τ', 'τ₁', 'τ₂', 'τ2', '2ζτ', 'ζ', 'β']
+
+
+def _normalize_equation(eq):
+    return eq.replace(" ", "").replace("²", "^2").replace("**", "^").lower()
+
+
+def _underdamped_params(params):
+    params['τ'] = (params['τ2'])**0.5
+    params['ζ'] = params['2ζτ'] / (2 * params['τ'])
+    return params
+
+
+#### tokenizer / parser for process model strings
+_TOKEN = re.compile(r"(\d+\.?\d*(?:e[+-]?\d+)?|\.\d+(?:e[+-]?\d+)?)|([s()/*^+-])")
+
+
+@instrument(size=len)
+def _tokenize(eq):
+    """
+    Splits a normalized equation into tokens in one scan. Inside parentheses
+    "a/b" between two numbers is read as a single fractional coefficient.
+    """
+    tokens = []
+    depth = 0
+    pos = 0
+    for match in _TOKEN.finditer(eq):
+        if match.start() != pos:
+            raise ValueError(f"unexpected character {eq[pos]!r}")
+        pos = match.end()
+        number, symbol = match.groups()
+        if number is not None:
+            if depth > 0 and len(tokens) >= 2 and tokens[-1] == '/' and isinstance(tokens[-2], float):
+                tokens.pop()
+                tokens[-1] = tokens[-1] / float(number)
+            else:
+                tokens.append(float(number))
+            continue
+        depth += symbol == '('
+        depth -= symbol == ')'
+        tokens.append(symbol)
+    if pos != len(eq):
+        raise ValueError(f"unexpected character {eq[pos]!r}")
+    return tokens
+
+
+def _poly_mul(a, b):
+    out = [0.0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        for j, y in enumerate(b):
+            out[i + j] += x * y
+    return out
+
+
+class _ModelParser:
+    """
+    Recursive-descent parser producing (gain, numerator factors, denominator factors),
+    where factors are polynomial coefficient lists ordered from s^0 upwards.
+
+        sum     := ['+'|'-'] product (('+'|'-') product)*
+        product := juxt ('/' juxt)*          (a/bc reads as a/(bc), as in the table)
+        juxt    := unary (['*'] unary)*
+        unary   := NUMBER | 's' [['^'] INT] | '(' sum ')' ['^' INT]
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self, expected=None):
+        token = self.peek()
+        if token is None or (expected is not None and token != expected):
+            raise ValueError(f"expected {expected!r}, got {token!r}")
+        self.pos += 1
+        return token
+
+    def parse(self):
+        value = self.sum()
+        if self.peek() is not None:
+            raise ValueError(f"unexpected token {self.peek()!r}")
+        return value
+
+    def sum(self):
+        sign = -1.0 if self.peek() == '-' else 1.0
+        if self.peek() in ('+', '-'):
+            self.take()
+        gain, num, den = self.product()
+        terms = [(sign * gain, num, den)]
+        while self.peek() in ('+', '-'):
+            sign = -1.0 if self.take() == '-' else 1.0
+            gain, num, den = self.product()
+            terms.append((sign * gain, num, den))
+        if len(terms) == 1:
+            return terms[0]
+        poly = [0.0]
+        for gain, num, den in terms:
+            if den:
+                raise ValueError("sums of fractions are not supported")
+            term = [gain]
+            for factor in num:
+                term = _poly_mul(term, factor)
+            poly = [x + y for x, y in zip(poly + [0.0] * len(term), term + [0.0] * len(poly))]
+        return 1.0, [poly], []
+
+    def product(self):
+        gain, num, den = self.juxt()
+        while self.peek() == '/':
+            self.take()
+            g, n, d = self.juxt()
+            gain, num, den = gain / g, num + d, den + n
+        return gain, num, den
+
+    def juxt(self):
+        gain, num, den = self.unary()
+        while self.peek() not in (None, ')', '/', '+', '-'):
+            if self.peek() == '*':
+                self.take()
+            g, n, d = self.unary()
+            gain, num, den = gain * g, num + n, den + d
+        return gain, num, den
+
+    def power(self):
+        if self.peek() == '^':
+            self.take()
+        exponent = self.take()
+        if not isinstance(exponent, float) or exponent != int(exponent) or exponent < 1:
+            raise ValueError(f"invalid exponent {exponent!r}")
+        return int(exponent)
+
+    def unary(self):
+        token = self.take()
+        if isinstance(token, float):
+            return token, [], []
+        if token == 's':
+            order = self.power() if self.peek() == '^' or isinstance(self.peek(), float) else 1
+            return 1.0, [[0.0] * order + [1.0]], []
+        if token == '(':
+            gain, num, den = self.sum()
+            self.take(')')
+            if self.peek() == '^':
+                order = self.power()
+                return gain**order, num * order, den * order
+            return gain, num, den
+        raise ValueError(f"unexpected token {token!r}")
+
+
+def _canonical_factors(gain, num, den):
+    """
+    Reduces parsed factors to the canonical factored form used for classification.
+    Every factor is scaled to a unit constant term and its scale moved into the gain.
+    """
+    form = {
+        'gain': gain,
+        'rhp_zeros': [],
+        'lead_zeros': [],
+        'other_zeros': 0,
+        'integrators': 0,
+        'first_order': [],
+        'second_order': [],
+    }
+    for factors, side in ((num, -1), (den, 1)):
+        for poly in factors:
+            while len(poly) > 1 and poly[-1] == 0:
+                poly = poly[:-1]
+            lead = 0
+            while len(poly) > 1 and poly[0] == 0:
+                poly = poly[1:]
+                lead += 1
+            form['integrators'] += side * lead
+            if poly[0] == 0:
+                raise ValueError("zero factor")
+            form['gain'] *= poly[0] if side < 0 else 1 / poly[0]
+            coeffs = [c / poly[0] for c in poly[1:]]
+            if not coeffs:
+                continue
+            if side < 0:
+                if len(coeffs) == 1 and coeffs[0] < 0:
+                    form['rhp_zeros'].append(-coeffs[0])
+                elif len(coeffs) == 1:
+                    form['lead_zeros'].append(coeffs[0])
+                else:
+                    form['other_zeros'] += 1
+            elif len(coeffs) == 1:
+                form['first_order'].append(coeffs[0])
+            elif len(coeffs) == 2:
+                form['second_order'].append((coeffs[1], coeffs[0]))
+            else:
+                raise ValueError("denominator factors above second order are not supported")
+    return form
+
+
+@instrument(size=len)
+def parse_process_model(eq):
+    """
+    Reads a process model string into its canonical factored form.
+
+    Equivalent spellings such as "(s+1)", "(1s+1)", "(1+s)", "(2s+2)", "s^2", "s²"
+    and fractional coefficients inside parentheses ("3/2s2") are all accepted.
+
+    Returns:
+        A dictionary with gain, rhp_zeros (β of -βs + 1 factors), lead_zeros,
+        integrators, first_order (τ of τs + 1 factors) and second_order
+        ((τ², 2ζτ) of τ²s² + 2ζτs + 1 factors), or None when the string cannot be read
+    """
+    try:
+        return _canonical_factors(*_ModelParser(_tokenize(_normalize_equation(eq))).parse())
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def model_polynomials(eq):
+    """
+    Numerator and denominator coefficients (highest power first) of a process
+    model string, rebuilt from its canonical factored form.
+
+    Returns:
+        (num, den) numpy arrays, or None when the string cannot be read
+    """
+    form = eq if isinstance(eq, dict) else parse_process_model(eq)
+    if form is None or form['other_zeros']:
+        return None
+    num = np.array([form['gain']])
+    for beta in form['rhp_zeros']:
+        num = np.polymul(num, [-beta, 1.0])
+    for lead in form['lead_zeros']:
+        num = np.polymul(num, [lead, 1.0])
+    den = np.array([1.0])
+    for tau in form['first_order']:
+        den = np.polymul(den, [tau, 1.0])
+    for tau2, two_zeta_tau in form['second_order']:
+        den = np.polymul(den, [tau2, two_zeta_tau, 1.0])
+    if form['integrators'] > 0:
+        den = np.polymul(den, [1.0] + [0.0] * form['integrators'])
+    elif form['integrators'] < 0:
+        num = np.polymul(num, [1.0] + [0.0] * -form['integrators'])
+    return num, den
+
+
+#### structure index: (rhp zeros, lead zeros, other zeros, integrators, first order, second order) -> models
+def _close(a, b):
+    return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-12)
+
+
+def _split_matching(values, target):
+    """Returns (target, remaining values) if one of the values equals target, else None."""
+    for i, value in enumerate(values):
+        if _close(value, target):
+            return value, values[:i] + values[i+1:]
+    return None
+
+
+def _second_order_params(form, params):
+    tau2, two_zeta_tau = form['second_order'][0]
+    # τ²s² + 2ζτs + 1 needs τ² > 0 and ζ > 0; an undamped or unstable factor matches no model
+    if tau2 <= 0 or two_zeta_tau <= 0:
+        return None
+    params['τ2'], params['2ζτ'] = tau2, two_zeta_tau
+    return _underdamped_params(params)
+
+
+def _model_e(form, epsilon):
+    beta = form['rhp_zeros'][0]
+    split = _split_matching(form['first_order'], beta)
+    if split:
+        return {'k': form['gain'], 'β': beta, 'τ': split[1][0]}
+
+
+def _model_g(form, epsilon):
+    beta = form['rhp_zeros'][0]
+    if _close(form['first_order'][0], beta):
+        return _second_order_params(form, {'k': form['gain'], 'β': beta})
+
+
+def _model_k(form, epsilon):
+    split = _split_matching(form['first_order'], 2*epsilon)
+    if split and _close(form['lead_zeros'][0], 2*epsilon):
+        return {'k': form['gain'], 'τ': split[1][0]}
+
+
+def _model_m(form, epsilon):
+    if _close(form['first_order'][0], epsilon):
+        return {'k': form['gain'], 'β': form['rhp_zeros'][0]}
+
+
+def _model_n(form, epsilon):
+    split = _split_matching(form['first_order'], epsilon)
+    if split and _close(split[1][0], 2):
+        return {'k': form['gain'], 'β': form['rhp_zeros'][0]}
+
+
+_MODEL_INDEX = {
+    (0, 0, 0, 0, 1, 0): [("A", lambda f, e: {'k': f['gain'], 'τ': f['first_order'][0]})],
+    (0, 0, 0, 0, 2, 0): [("B", lambda f, e: {'k': f['gain'], 'τ₁': f['first_order'][0], 'τ₂': f['first_order'][1]})],
+    (0, 0, 0, 0, 0, 1): [("C", lambda f, e: _second_order_params(f, {'k': f['gain']}))],
+    # M is D with its lag at τ = ϵ, so the more specific M is tried first
+    (1, 0, 0, 0, 1, 0): [("M", _model_m),
+                         ("D", lambda f, e: {'k': f['gain'], 'β': f['rhp_zeros'][0], 'τ': f['first_order'][0]})],
+    (1, 0, 0, 0, 2, 0): [("E", _model_e), ("N", _model_n)],
+    (1, 0, 0, 0, 0, 1): [("F", lambda f, e: _second_order_params(f, {'k': f['gain'], 'β': f['rhp_zeros'][0]}))],
+    (1, 0, 0, 0, 1, 1): [("G", _model_g)],
+    (0, 0, 0, 1, 0, 0): [("H", lambda f, e: {'k': f['gain']})],
+    (0, 1, 0, 1, 0, 0): [("I", lambda f, e: {'k': f['gain']} if _close(f['lead_zeros'][0], 2) else None)],
+    (0, 0, 0, 1, 1, 0): [("J", lambda f, e: {'k': f['gain'], 'τ': f['first_order'][0]})],
+    (0, 1, 0, 1, 2, 0): [("K", _model_k)],
+    (1, 0, 0, 1, 0, 0): [("L", lambda f, e: {'k': f['gain'], 'β': f['rhp_zeros'][0]})],
+}
+
+
+def _structure_key(form):
+    return (len(form['rhp_zeros']), len(form['lead_zeros']), form['other_zeros'],
+            form['integrators'], len(form['first_order']), len(form['second_order']))
+
+
+@instrument()
+def _match_model(eq, epsilon):
+    """
+    Parses the equation once and dispatches on its structure to the matching model.
+
+    Returns:
+        (model_type, parameters), or (None, {}) when no model matches
+    """
+    form = parse_process_model(eq)
+    if form is None:
+        return None, {}
+    for model_type, extract in _MODEL_INDEX.get(_structure_key(form), []):
+        params = extract(form, epsilon)
+        if params is not None:
+            return model_type, params
+    return None, {}
+
+
+@instrument()
 def identify_model_and_calculate_params(eq, epsilon=1.0):
     """
     Identifies the model type and calculates PID parameters based on IMC tuning rules
@@ -21,11 +381,6 @@ def identify_model_and_calculate_params(eq, epsilon=1.0):
         - pid_params: Dictionary with k_c, τ_I, τ_D, τ_F
         - comments: Any special notes about the model
     """
-    eq = eq.replace(" ", "").replace("²", "2").lower()
-    
-    # Helper function to extract parameters
-    def get_params(match, names):
-        return {name: float(match.group(i+1)) for i, name in enumerate(names)}
     
     result = {
         'model_type': None,
@@ -34,267 +389,138 @@ def identify_model_and_calculate_params(eq, epsilon=1.0):
         'comments': None
     }
     
-    # Model A: k/(τs + 1)
-    match = re.fullmatch(r"([\d\.+-]+)/\(([\d\.+-]+)s\+([\d\.+-]+)\)", eq)
-    if match and float(match.group(3)) == 1:
-        params = get_params(match, ['k', 'τ'])
-        result.update({
-            'model_type': "A",
-            'parameters': params,
-            'pid_params': {
-                'k_c': params['τ'] / (params['k'] * epsilon),
-                'τ_I': params['τ'],
-                'τ_D': None,
-                'τ_F': None
-            },
-            'comments': "First-order process"
-        })
-        return result
-    
-    # Model B: k/((τ₁s + 1)(τ₂s + 1))
-    match = re.fullmatch(r"([\d\.+-]+)/\(\(([\d\.+-]+)s\+1\)\(([\d\.+-]+)s\+1\)\)", eq)
-    if match:
-        params = get_params(match, ['k', 'τ₁', 'τ₂'])
-        result.update({
-            'model_type': "B",
-            'parameters': params,
-            'pid_params': {
-                'k_c': (params['τ₁'] + params['τ₂']) / (params['k'] * epsilon),
-                'τ_I': params['τ₁'] + params['τ₂'],
-                'τ_D': (params['τ₁'] * params['τ₂']) / (params['τ₁'] + params['τ₂']),
-                'τ_F': None
-            },
-            'comments': "Second-order process (two time constants)"
-        })
-        return result
-    
-    # Model C: k/(τ2s2 + 2ζτs + 1)
-    match = re.fullmatch(r"([\d\.+-]+)/\(([\d\.+-]+)s2\+([\d\.+-]+)s\+1\)", eq)
-    if match:
-        params = get_params(match, ['k', 'τ2', '2ζτ'])
-        params['τ'] = (params['τ2'])**0.5
-        params['ζ'] = params['2ζτ'] / (2 * params['τ'])
-        result.update({
-            'model_type': "C",
-            'parameters': params,
-            'pid_params': {
-                'k_c': params['2ζτ'] / (params['k'] * epsilon),
-                'τ_I': 2 * params['ζ'] * params['τ'],
-                'τ_D': params['τ'] / (2 * params['ζ']),
-                'τ_F': None
-            },
-            'comments': "Second-order underdamped process"
-        })
-        return result
-    
-    # Model D: k(-βs + 1)/(τs + 1)
-    match = re.fullmatch(r"([\d\.+-]+)\(-([\d\.+-]+)s\+1\)/\(([\d\.+-]+)s\+([\d\.+-]+)\)", eq)
-    if match and float(match.group(4)) == 1:
-        params = get_params(match, ['k', 'β', 'τ'])
-        result.update({
-            'model_type': "D",
-            'parameters': params,
-            'pid_params': {
-                'k_c': params['τ'] / (params['k'] * (epsilon + params['β'])),
-                'τ_I': params['τ'],
-                'τ_D': None,
-                'τ_F': epsilon
-            },
-            'comments': "First-order with RHP zero (β > 0)"
-        })
-        return result
-    
-    # Model E: k(-βs + 1)/((τs + 1)(βs + 1))
-    match = re.fullmatch(r"([\d\.+-]+)\(-([\d\.+-]+)s\+1\)/\(\(([\d\.+-]+)s\+1\)\(([\d\.+-]+)s\+1\)\)", eq)
-    if match and float(match.group(3)) == float(match.group(4)):
-        params = get_params(match, ['k', 'β', 'τ'])
-        result.update({
-            'model_type': "E",
-            'parameters': params,
-            'pid_params': {
-                'k_c': params['τ'] / (params['k'] * (2*epsilon + params['β'])),
-                'τ_I': params['τ'],
-                'τ_D': None,
-                'τ_F': 2*epsilon + params['β']
-            },
-            'comments': "First-order with RHP zero and matching pole (β > 0)"
-        })
-        return result
-    
-    # Model F: k(-βs + 1)/(τ2s2 + 2ζτs + 1)
-    match = re.fullmatch(r"([\d\.+-]+)\(-([\d\.+-]+)s\+1\)/\(([\d\.+-]+)s2\+([\d\.+-]+)s\+1\)", eq)
-    if match:
-        params = get_params(match, ['k', 'β', 'τ2', '2ζτ'])
-        params['τ'] = (params['τ2'])**0.5
-        params['ζ'] = params['2ζτ'] / (2 * params['τ'])
-        result.update({
-            'model_type': "F",
-            'parameters': params,
-            'pid_params': {
-                'k_c': params['2ζτ'] / (params['k'] * (epsilon + params['β'])),
-                'τ_I': 2 * params['ζ'] * params['τ'],
-                'τ_D': params['τ'] / (2 * params['ζ']),
-                'τ_F': epsilon
-            },
-            'comments': "Second-order underdamped with RHP zero (β > 0)"
-        })
-        return result
-    
-    # Model G: k(-βs + 1)/((τ2s2 + 2ζτs + 1)(βs + 1))
-    match = re.fullmatch(r"([\d\.+-]+)\(-([\d\.+-]+)s\+1\)/\(\(([\d\.+-]+)s2\+([\d\.+-]+)s\+1\)\(([\d\.+-]+)s\+1\)\)", eq)
-    if match and float(match.group(5)) == float(match.group(2)):
-        params = get_params(match, ['k', 'β', 'τ2', '2ζτ'])
-        params['τ'] = (params['τ2'])**0.5
-        params['ζ'] = params['2ζτ'] / (2 * params['τ'])
-        result.update({
-            'model_type': "G",
-            'parameters': params,
-            'pid_params': {
-                'k_c': params['2ζτ'] / (params['k'] * (2*epsilon + params['β'])),
-                'τ_I': 2 * params['ζ'] * params['τ'],
-                'τ_D': params['τ'] / (2 * params['ζ']),
-                'τ_F': 2*epsilon + params['β']
-            },
-            'comments': "Second-order underdamped with RHP zero and matching pole (β > 0)"
-        })
-        return result
-    
-    # Model H: k/s
-    match = re.fullmatch(r"([\d\.+-]+)/s", eq)
-    if match:
-        params = get_params(match, ['k'])
-        result.update({
-            'model_type': "H",
-            'parameters': params,
-            'pid_params': {
-                'k_c': 1 / (params['k'] * epsilon),
-                'τ_I': None,
-                'τ_D': None,
-                'τ_F': None
-            },
-            'comments': "Integrator process"
-        })
-        return result
-    
-    # Model I: k(2s + 1)/s
-    match = re.fullmatch(r"([\d\.+-]+)\(([\d\.+-]+)s\+1\)/s", eq)
-    if match and float(match.group(2)) == 2:
-        params = get_params(match, ['k'])
-        result.update({
-            'model_type': "I",
-            'parameters': params,
-            'pid_params': {
-                'k_c': 2 / (params['k'] * epsilon),
-                'τ_I': 2,
-                'τ_D': 2*epsilon,
-                'τ_F': None
-            },
-            'comments': "Integrator with lead"
-        })
-        return result
-    
-    # Model J: k/(s(τs + 1))
-    match = re.fullmatch(r"([\d\.+-]+)/\(s\(([\d\.+-]+)s\+([\d\.+-]+)\)\)", eq)
-    if match and float(match.group(3)) == 1:
-        params = get_params(match, ['k', 'τ'])
-        result.update({
-            'model_type': "J",
-            'parameters': params,
-            'pid_params': {
-                'k_c': 1 / (params['k'] * epsilon),
-                'τ_I': None,
-                'τ_D': None,
-                'τ_F': params['τ']
-            },
-            'comments': "Integrator with first-order lag"
-        })
-        return result
-    
-    # Model K: k(2ϵs + 1)/(s(τs + 1)(2ϵs + 1))
-    match = re.fullmatch(r"([\d\.+-]+)\(([\d\.+-]+)s\+1\)/\(s\(([\d\.+-]+)s\+1\)\(([\d\.+-]+)s\+1\)\)", eq)
-    if match and float(match.group(2)) == 2*epsilon and float(match.group(4)) == 2*epsilon:
-        params = get_params(match, ['k', 'τ'])
-        result.update({
-            'model_type': "K",
-            'parameters': params,
-            'pid_params': {
-                'k_c': (2*epsilon + params['τ']) / (params['k'] * epsilon**2),
-                'τ_I': 2*epsilon + params['τ'],
-                'τ_D': (2*epsilon * params['τ']) / (2*epsilon + params['τ']),
-                'τ_F': None
-            },
-            'comments': "Complex integrator process"
-        })
-        return result
-    
-    # Model L: k(-βs + 1)/s
-    match = re.fullmatch(r"([\d\.+-]+)\(-([\d\.+-]+)s\+1\)/s", eq)
-    if match:
-        params = get_params(match, ['k', 'β'])
-        result.update({
-            'model_type': "L",
-            'parameters': params,
-            'pid_params': {
-                'k_c': 1 / (params['k'] * (epsilon + params['β'])),
-                'τ_I': None,
-                'τ_D': None,
-                'τ_F': epsilon
-            },
-            'comments': "Integrator with RHP zero (β > 0)"
-        })
+    model_type, params = _match_model(eq, epsilon)
+    if model_type is None:
         return result
-    
-    # Model M: k(-βs + 1)/(ϵs + 1)
-    match = re.fullmatch(r"([\d\.+-]+)\(-([\d\.+-]+)s\+1\)/\(([\d\.+-]+)s\+([\d\.+-]+)\)", eq)
-    if match and float(match.group(3)) == epsilon and float(match.group(4)) == 1:
-        params = get_params(match, ['k', 'β'])
-        result.update({
-            'model_type': "M",
-            'parameters': params,
-            'pid_params': {
-                'k_c': 1 / (params['k'] * (2*epsilon + params['β'])),
-                'τ_I': 1,
-                'τ_D': None,
-                'τ_F': 2*epsilon + params['β']
-            },
-            'comments': "First-order with RHP zero and ϵ filter (β > 0)"
-        })
-        return result
-    
-    # Model N: k(-βs + 1)/((ϵs + 1)(2s + 1))
-    match = re.fullmatch(r"([\d\.+-]+)\(-([\d\.+-]+)s\+1\)/\(\(([\d\.+-]+)s\+1\)\(([\d\.+-]+)s\+1\)\)", eq)
-    if match and float(match.group(3)) == epsilon and float(match.group(4)) == 2:
-        params = get_params(match, ['k', 'β'])
-        result.update({
-            'model_type': "N",
-            'parameters': params,
-            'pid_params': {
-                'k_c': 1 / (params['k'] * (2*epsilon + params['β'])),
-                'τ_I': 2*epsilon,
-                'τ_D': 2*epsilon,
-                'τ_F': 2*epsilon + params['β']
-            },
-            'comments': "Complex dynamics with RHP zero (β > 0)"
-        })
-        return result
-    
+
+    k_c, tau_i, tau_d, tau_f = _pid_formulas(model_type, params, epsilon)
+    result.update({
+        'model_type': model_type,
+        'parameters': params,
+        'pid_params': {'k_c': k_c, 'τ_I': tau_i, 'τ_D': tau_d, 'τ_F': tau_f},
+        'comments': _MODEL_COMMENTS[model_type]
+    })
     return result
 
+
+#### tuning formulas on parameter arrays
+def imc_pid_params(model_type, parameters, epsilon=1.0):
+    """
+    Evaluates the IMC rules of one model class (row of imc_pid_table) on arrays.
+
+    Args:
+        model_type: row of the table, "A" to "N"
+        parameters: model parameters keyed 'k', 'τ', 'τ₁', 'τ₂', 'ζ', 'β' as in
+            identify_model_and_calculate_params; scalars or arrays
+        epsilon: IMC filter time constant, a scalar or an array
+
+    Returns:
+        A dictionary k_c, τ_I, τ_D, τ_F of float arrays broadcast over the
+        parameters and epsilon (NaN for '-'), e.g. a whole fleet of loops or a
+        full epsilon sweep (epsilon[:, None] against parameter rows) in one evaluation
+    """
+    if model_type not in tuning_rules():
+        raise ValueError(f"unknown model {model_type!r}; expected one of {imc_pid_table['Model']}")
+    values = [np.nan if v is None else v for v in _pid_formulas(model_type, parameters, epsilon)]
+    shape = np.broadcast_shapes(np.shape(epsilon), *(np.shape(v) for v in parameters.values()))
+    return {name: np.broadcast_to(np.asarray(v, dtype=float), shape) for name, v in zip(PID_COLUMNS, values)}
+
+
+#### batch tuning of many process models
+def _as_model_frame(models, epsilon, model_column, epsilon_column):
+    if isinstance(models, str):
+        models = pd.read_csv(models)
+    if isinstance(models, pd.DataFrame):
+        frame = pd.DataFrame({'model': models[model_column].astype(str).to_numpy()})
+        if epsilon_column in models.columns:
+            epsilon = models[epsilon_column].to_numpy(dtype=float)
+    else:
+        frame = pd.DataFrame({'model': [str(m) for m in models]})
+    frame['epsilon'] = np.broadcast_to(np.asarray(epsilon, dtype=float), (len(frame),))
+    return frame
+
+
+def _as_column(value, n):
+    if value is None:
+        return np.full(n, np.nan)
+    return np.broadcast_to(np.asarray(value, dtype=float), (n,))
+
+
+@instrument(size=lambda models, *args, **kwargs: len(models) if not isinstance(models, str) else None)
+def batch_identify_and_calculate_params(models, epsilon=1.0, model_column='model', epsilon_column='epsilon'):
+    """
+    Identifies and tunes many process models in one call
+
+    Each distinct (equation, epsilon) pair is classified once, then the PID
+    formulas are evaluated on numpy arrays for all rows of the same model type.
+
+    Args:
+        models: A list of equation strings, the path to a CSV file or a DataFrame
+        epsilon: IMC filter time constant, a scalar or one value per row (default=1.0).
+            Ignored when the CSV/DataFrame has an epsilon column.
+        model_column: Column holding the equation strings in a CSV/DataFrame
+        epsilon_column: Column holding per-row epsilon values in a CSV/DataFrame
+
+    Returns:
+        A DataFrame with one row per model and the columns model, epsilon, model_type,
+        the extracted parameters (NaN where a model has no such parameter),
+        k_c, τ_I, τ_D, τ_F (NaN for '-') and comments
+    """
+    frame = _as_model_frame(models, epsilon, model_column, epsilon_column)
+    n = len(frame)
+    epsilons = frame['epsilon'].to_numpy()
+
+    matches = {}
+    model_types = np.empty(n, dtype=object)
+    row_params = [None] * n
+    for i, (eq, eps) in enumerate(zip(frame['model'], epsilons)):
+        key = (_normalize_equation(eq), eps)
+        if key not in matches:
+            matches[key] = _match_model(key[0], eps)
+        model_types[i], row_params[i] = matches[key]
+
+    columns = {name: np.full(n, np.nan) for name in _PARAMETER_NAMES}
+    pid = {name: np.full(n, np.nan) for name in PID_COLUMNS}
+    for model_type in imc_pid_table["Model"]:
+        idx = np.flatnonzero(model_types == model_type)
+        if idx.size == 0:
+            continue
+        params = {name: np.array([row_params[i][name] for i in idx]) for name in row_params[idx[0]]}
+        for name, values in params.items():
+            columns[name][idx] = values
+        for name, values in zip(pid, _pid_formulas(model_type, params, epsilons[idx])):
+            pid[name][idx] = _as_column(values, idx.size)
+
+    frame['model_type'] = model_types
+    for name in _PARAMETER_NAMES:
+        if not np.all(np.isnan(columns[name])):
+            frame[name] = columns[name]
+    for name, values in pid.items():
+        frame[name] = values
+    frame['comments'] = [_MODEL_COMMENTS.get(m) for m in model_types]
+    return frame
+
 #### how to use
-################ input (s+1) as (1s+1)
-################ input (s^2+1) as (1s2+1)
-
-# eq_1 = sp.simplify*()
-
-eq = "7.5/(3/2s2+5/2s+1)" #### insert your equation here as a string 
-
-result = identify_model_and_calculate_params(eq, epsilon=1.0)
-model = result['model_type']
-if model:
-    print(f"Model {model} with parameters: {result['parameters']}")
-    print(f"  k_c: {result['pid_params']['k_c']:.4f}")
-    print(f"  τ_I: {result['pid_params']['τ_I'] if result['pid_params']['τ_I'] is not None else '-'}")
-    print(f"  τ_D: {result['pid_params']['τ_D'] if result['pid_params']['τ_D'] is not None else '-'}")
-    print(f"  τ_F: {result['pid_params']['τ_F'] if result['pid_params']['τ_F'] is not None else '-'}")
-else:
-    print("No matching model found")
\ No newline at end of file
+################ (s+1), (1s+1) and (1+s) are all accepted
+################ s^2, s² and s2 are all accepted
+
+################ run with: python -m solvers.imc_tunning
+
+if __name__ == "__main__":
+    eq = "7.5/(3/2s2+5/2s+1)" #### insert your equation here as a string 
+
+    result = identify_model_and_calculate_params(eq, epsilon=1.0)
+    model = result['model_type']
+    if model:
+        print(f"Model {model} with parameters: {result['parameters']}")
+        print(f"  k_c: {result['pid_params']['k_c']:.4f}")
+        print(f"  τ_I: {result['pid_params']['τ_I'] if result['pid_params']['τ_I'] is not None else '-'}")
+        print(f"  τ_D: {result['pid_params']['τ_D'] if result['pid_params']['τ_D'] is not None else '-'}")
+        print(f"  τ_F: {result['pid_params']['τ_F'] if result['pid_params']['τ_F'] is not None else '-'}")
+    else:
+        print("No matching model found")
+
+#### batch usage
+# models = ["2/(3s+1)", "2/((3s+1)(4s+1))", "2/s"]
+# tuned = batch_identify_and_calculate_params(models, epsilon=[1.0, 0.5, 2.0])
+# tuned = batch_identify_and_calculate_params("loops.csv")  # columns: model, epsilon
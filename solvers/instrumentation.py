@@ -0,0 +1,205 @@
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+from ._lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+#### opt-in: SOLVERS_PROFILE=1 in the environment, enable(), or `with profiling():`
+_enabled = os.environ.get("SOLVERS_PROFILE", "0") == "1"
+_lock = threading.Lock()
+_local = threading.local()
+_stats = {}      # call path (tuple of stage names) -> [calls, wall, self, size_total, size_max]
+_events = []
+MAX_EVENTS = 1_000_000
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """Drops everything recorded so far."""
+    with _lock:
+        _stats.clear()
+        _events.clear()
+
+
+class profiling:
+    """Context manager recording the solver stages run inside it (`with profiling(): ...`)."""
+
+    def __enter__(self):
+        self._previous = _enabled
+        enable()
+        return self
+
+    def __exit__(self, *exc):
+        if not self._previous:
+            disable()
+        return False
+
+
+#### decorator for solver functions, context manager for library calls inside them
+class _Stage:
+    __slots__ = ('name', 'size', 'start', 'stack')
+
+    def __init__(self, name, size=None):
+        self.name = name
+        self.size = size
+
+    def __enter__(self):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        self.stack = stack
+        stack.append([self.name, 0.0])
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.start
+        stack = self.stack
+        _, children = stack.pop()
+        path = tuple(frame[0] for frame in stack) + (self.name,)
+        if stack:
+            stack[-1][1] += wall
+        _record(path, self.start, wall, wall - children, self.size)
+        return False
+
+
+_DISABLED = contextlib.nullcontext()
+
+
+def stage(name, size=None):
+    """
+    Context manager timing a block as stage `name`, e.g. a library call:
+
+        with stage("control.margin"):
+            gm, pm, wg, wp = ctrl.margin(sys)
+
+    Returns a shared no-op context while instrumentation is disabled.
+    """
+    if not _enabled:
+        return _DISABLED
+    return _Stage(name, size)
+
+
+def instrument(name=None, size=None):
+    """
+    Records wall time, call count and input size of every call of the decorated
+    stage while instrumentation is enabled; when it is disabled the wrapper only
+    checks one flag before calling through.
+
+    Args:
+        name: stage name, default "<module>.<function>"
+        size: optional function of the call's arguments returning its input size
+            (polynomial order, number of systems, grid length, ...)
+    """
+    def decorator(func):
+        stage_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            n = None
+            if size is not None:
+                try:
+                    n = int(size(*args, **kwargs))
+                except Exception:
+                    n = None
+            with _Stage(stage_name, n):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _record(path, start, wall, self_time, n):
+    with _lock:
+        entry = _stats.get(path)
+        if entry is None:
+            entry = _stats[path] = [0, 0.0, 0.0, 0, 0]
+        entry[0] += 1
+        entry[1] += wall
+        entry[2] += self_time
+        if n is not None:
+            entry[3] += n
+            entry[4] = max(entry[4], n)
+        if len(_events) < MAX_EVENTS:
+            _events.append({'stage': path[-1], 'path': ";".join(path), 'start': start,
+                            'wall': wall, 'self': self_time, 'size': n,
+                            'thread': threading.get_ident()})
+
+
+#### reports and exports
+def summary():
+    """
+    Per-stage totals over every call path, slowest first.
+
+    Returns:
+        A DataFrame indexed by stage with the columns calls, wall (s, summed over
+        outermost calls only, so recursion is not double counted), self (s,
+        excluding instrumented sub-stages), mean_ms, mean_size, max_size
+    """
+    rows = {}
+    with _lock:
+        items = list(_stats.items())
+    for path, (calls, wall, self_time, size_total, size_max) in items:
+        row = rows.setdefault(path[-1], {'calls': 0, 'wall': 0.0, 'self': 0.0, 'size_total': 0, 'max_size': 0})
+        row['calls'] += calls
+        row['self'] += self_time
+        if path[-1] not in path[:-1]:
+            row['wall'] += wall
+        row['size_total'] += size_total
+        row['max_size'] = max(row['max_size'], size_max)
+    frame = pd.DataFrame.from_dict(rows, orient='index',
+                                   columns=['calls', 'wall', 'self', 'size_total', 'max_size'])
+    frame['mean_ms'] = frame['wall'] / frame['calls'] * 1000
+    frame['mean_size'] = frame['size_total'] / frame['calls']
+    return frame.drop(columns='size_total')[['calls', 'wall', 'self', 'mean_ms', 'mean_size', 'max_size']] \
+        .sort_values('wall', ascending=False)
+
+
+def export_log(path):
+    """Writes one JSON object per recorded call (stage, call path, start, wall, self, size, thread)."""
+    with _lock:
+        events = list(_events)
+    with open(path, "w") as handle:
+        for event in events:
+            handle.write(json.dumps(event) + "\n")
+    return path
+
+
+def export_folded(path):
+    """
+    Writes the call paths in the folded-stack format read by flamegraph.pl and
+    speedscope ("outer;inner;stage <value>"), the value being self time in microseconds.
+    """
+    with _lock:
+        items = sorted(_stats.items())
+    with open(path, "w") as handle:
+        for stack, (_, _, self_time, _, _) in items:
+            handle.write(f"{';'.join(stack)} {max(int(round(self_time * 1e6)), 0)}\n")
+    return path
+
+
+#### how to use
+# from solvers import instrumentation
+# with instrumentation.profiling():
+#     batch_identify_and_calculate_params("loops.csv")
+# print(instrumentation.summary())
+# instrumentation.export_folded("retune.folded")   ##### flamegraph.pl retune.folded > retune.svg
@@ -1,36 +1,126 @@
+import functools
+
 import numpy as np
-import matplotlib.pyplot as plt
-import control as ctrl 
-import sympy as sp
+from ._lazy import lazy_import
+from .instrumentation import instrument
+from .results import ExpressionResult
+
+sp = lazy_import("sympy")
+ctrl = lazy_import("control")
 
 #### linearization of a system
-def  linearization_of_system(eq):
+def  linearization_of_system(eq, verbose=True):
     x = sp.Symbol('x')
     xs = sp.Symbol('x_s') 
 
     F_taylor = eq.subs(x, xs) + sp.diff(eq, x).subs(x, xs) * (x - xs)
 
-    return sp.pprint(F_taylor)
+    result = ExpressionResult(F_taylor, pretty=True)
+    return result.show() if verbose else result
 
 ### how to use
-x = sp.Symbol('x')
-xs = sp.Symbol('x_s')  # Operating point
-eq = sp.sqrt(x)
-linearization_of_system(eq)
+# x = sp.Symbol('x')
+# xs = sp.Symbol('x_s')  # Operating point
+# eq = sp.sqrt(x)
+# linearization_of_system(eq)
 
 #### linearization of a system with multiple variables
 
-def linearization_system_with_multiple_variables(eq, X_o, Y_o):
+def linearization_system_with_multiple_variables(eq, X_o, Y_o, verbose=True):
     X, Y = sp.symbols('X Y')
     eq = eq.subs({X: X_o, Y: Y_o}) + sp.diff(eq,X).subs({X: X_o, Y: Y_o}) * (X - X_o) + sp.diff(eq,Y).subs({X: X_o, Y: Y_o}) * (Y -Y_o)
-    return sp.pprint(eq)
+    result = ExpressionResult(eq, pretty=True)
+    return result.show() if verbose else result
 
 
 #### how to use 
-X = sp.symbols('X')
-Y = sp.symbols('Y')
-X_o, Y_o = sp.symbols('X_o Y_o') # can use this or act values
+# X = sp.symbols('X')
+# Y = sp.symbols('Y')
+# X_o, Y_o = sp.symbols('X_o Y_o') # can use this or act values
 # X_o = 50
 # Y_o = 1.23
-eq = (1.23*X)/(Y+2)
+# eq = (1.23*X)/(Y+2)
 # linearization_system_with_multiple_variables(eq,X_o,Y_o)
+
+
+
+#### linearization to state space at many operating points
+class CompiledLinearization:
+    """
+    Linearization of dx/dt = f(x, u), y = h(x, u) for arbitrary state and input symbols.
+
+    The Jacobians A = df/dx, B = df/du, C = dh/dx and D = dh/du are differentiated
+    once and compiled to NumPy functions, so they can be evaluated at arrays of
+    operating points in one call.
+    """
+
+    @instrument(name="linearization.CompiledLinearization", size=lambda self, f, *args, **kwargs: len(f))
+    def __init__(self, f, states, inputs, outputs=None):
+        self.states = tuple(states)
+        self.inputs = tuple(inputs)
+        f = sp.Matrix(list(f))
+        h = sp.Matrix(list(outputs) if outputs is not None else list(states))
+        args = self.states + self.inputs
+        self.jacobians = (f.jacobian(self.states), f.jacobian(self.inputs),
+                          h.jacobian(self.states), h.jacobian(self.inputs))
+        self._compiled = [sp.lambdify(args, list(J), 'numpy') for J in self.jacobians]
+
+    @instrument(size=lambda self, x_ops, u_ops: np.shape(np.atleast_2d(x_ops))[0])
+    def matrices(self, x_ops, u_ops):
+        """
+        A, B, C, D at M operating points.
+
+        Args:
+            x_ops: states at the operating points, shape (M, n) or (n,)
+            u_ops: inputs at the operating points, shape (M, m) or (m,)
+
+        Returns:
+            A (M, n, n), B (M, n, m), C (M, p, n), D (M, p, m)
+        """
+        x_ops = np.atleast_2d(np.asarray(x_ops, dtype=float))
+        u_ops = np.atleast_2d(np.asarray(u_ops, dtype=float))
+        count = max(x_ops.shape[0], u_ops.shape[0])
+        points = np.concatenate([np.broadcast_to(x_ops, (count, x_ops.shape[1])),
+                                 np.broadcast_to(u_ops, (count, u_ops.shape[1]))], axis=1)
+        args = list(points.T)
+        out = []
+        for J, compiled in zip(self.jacobians, self._compiled):
+            entries = [np.broadcast_to(np.asarray(e, dtype=float), (count,)) for e in compiled(*args)]
+            stacked = np.stack(entries, axis=1) if entries else np.zeros((count, 0))
+            out.append(stacked.reshape(count, J.rows, J.cols))
+        return tuple(out)
+
+    def state_space(self, x_ops, u_ops):
+        """ctrl.StateSpace models at each operating point."""
+        return [ctrl.StateSpace(*m) for m in zip(*self.matrices(x_ops, u_ops))]
+
+
+@functools.lru_cache(maxsize=64)
+def _cached_linearization(f, states, inputs, outputs):
+    return CompiledLinearization(f, states, inputs, outputs)
+
+
+def compile_linearization(f, states, inputs, outputs=None):
+    """
+    Cached CompiledLinearization of dx/dt = f(x, u) (y = h(x, u), default y = x).
+
+    Args:
+        f: sympy expressions, one per state
+        states, inputs: sequences of sympy symbols
+        outputs: optional sympy expressions h(x, u)
+    """
+    return _cached_linearization(tuple(sp.sympify(list(f))), tuple(states), tuple(inputs),
+                                 None if outputs is None else tuple(sp.sympify(list(outputs))))
+
+
+#### how to use 
+# h, q = sp.symbols('h q')
+# lin = compile_linearization([(q - 0.5*sp.sqrt(h))/2], [h], [q])
+# h_ops = np.linspace(1, 4, 300)
+# A, B, C, D = lin.matrices(h_ops[:, None], (0.5*np.sqrt(h_ops))[:, None])
+# models = lin.state_space(h_ops[:, None], (0.5*np.sqrt(h_ops))[:, None])
+
+
+if __name__ == "__main__":
+    x = sp.Symbol('x')
+    linearization_of_system(sp.sqrt(x))
@@ -1,16 +1,15 @@
-import numpy as np
-import matplotlib.pyplot as plt
-import control as ctrl 
-import sympy as sp
+from .rendering import finish, get_axes
 
 #### plotting an equation
-def plotting_equation(t, eq):
-    plt.plot(t,eq, label = 'equation')
-    plt.xlabel('Time (s)')
-    plt.ylabel('y(t)')
-    plt.grid(which = 'both', linewidth = 0.5)
-    plt.legend()
-    plt.show()
+def plotting_equation(t, eq, path=None):
+    fig, axes = get_axes('equation', path=path)
+    ax = axes[0, 0]
+    ax.plot(t,eq, label = 'equation')
+    ax.set_xlabel('Time (s)')
+    ax.set_ylabel('y(t)')
+    ax.grid(which = 'both', linewidth = 0.5)
+    ax.legend()
+    return finish(fig, path)
 
 
 #### how to use
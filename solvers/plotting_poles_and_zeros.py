@@ -1,56 +1,248 @@
+import functools
+
 import numpy as np
-import matplotlib.pyplot as plt
-import control as ctrl 
-import sympy as sp
+from ._lazy import lazy_import
+from .composition import parallel
+from .instrumentation import instrument
+from .polynomials import batch_roots, stack_coefficients, stack_pair
+from .rendering import finish, get_axes
+from .results import PolesZerosBatch
+
+optimize = lazy_import("scipy.optimize")
+
+### finding the poles and zeros of many systems at once
+@instrument(size=lambda nums, dens, *args, **kwargs: np.shape(stack_coefficients(dens))[0])
+def poles_and_zeros(nums, dens, cancellation_tol=1e-6):
+    """
+    Poles and zeros of N systems from batched companion-matrix eigenvalues.
+
+    A pole and a zero closer than cancellation_tol (relative to the pole's
+    magnitude, absolute below 1) are flagged as a near cancellation.
+
+    Args:
+        nums, dens: coefficient lists (highest power first) of N systems, or of
+            one system; a single numerator or denominator is shared by all
+        cancellation_tol: relative distance below which a pole-zero pair cancels
+
+    Returns:
+        A PolesZerosBatch with
+        - poles: (N, n) complex array, NaN-padded for lower-order denominators
+        - zeros: (N, m) complex array, NaN-padded
+        - cancelled_poles: (N, n) mask of poles with a zero within tolerance
+        - cancelled_zeros: (N, m) mask of zeros with a pole within tolerance
+        Indexing it with i gives the PolesZeros of system i.
+    """
+    zeros, poles = batch_roots(stack_coefficients(nums)), batch_roots(stack_coefficients(dens))
+    rows = max(zeros.shape[0], poles.shape[0])
+    zeros = np.broadcast_to(zeros, (rows, zeros.shape[1])).copy()
+    poles = np.broadcast_to(poles, (rows, poles.shape[1])).copy()
+    return _cancellations(zeros, poles, cancellation_tol)
+
+
+def _cancellations(zeros, poles, cancellation_tol):
+    """PolesZerosBatch of (N, m) zeros and (N, n) poles, with the near cancellations flagged."""
+    scale = cancellation_tol * np.maximum(1.0, np.abs(poles))
+    cancelled_poles = np.zeros(poles.shape, dtype=bool)
+    cancelled_zeros = np.zeros(zeros.shape, dtype=bool)
+    for j in range(zeros.shape[1]):
+        close = np.abs(poles - zeros[:, j:j + 1]) <= scale
+        cancelled_poles |= close
+        cancelled_zeros[:, j] = close.any(axis=1)
+    return PolesZerosBatch(zeros, poles, cancelled_zeros, cancelled_poles)
 
-### finding the poles and zeros of the system
-def plotting_poles_zeros(num1, den1):
-    sys = ctrl.TransferFunction(num1,den1)
-    ctrl.pzmap(sys,Plot = True)
-    plt.show()
+
+### plotting the poles and zeros of the system
+def plotting_poles_zeros(num1, den1, path=None, cancellation_tol=1e-6):
+    """
+    Pole-zero map of num1/den1. Stacked coefficient lists draw every system on
+    the same axes; near pole-zero cancellations are drawn in red.
+    """
+    return _draw_poles_zeros(poles_and_zeros(num1, den1, cancellation_tol), path)
+
+
+def _draw_poles_zeros(pz, path):
+    fig, axes = get_axes('pole_zero', path=path)
+    ax = axes[0, 0]
+    for key, marker in (('poles', 'x'), ('zeros', 'o')):
+        points = pz[key]
+        colors = np.where(pz['cancelled_' + key], 'C3', 'C0')[~np.isnan(points)]
+        points = points[~np.isnan(points)]
+        if marker == 'o':
+            ax.scatter(points.real, points.imag, marker=marker, facecolors='none', edgecolors=colors)
+        else:
+            ax.scatter(points.real, points.imag, marker=marker, color=colors)
+    ax.axhline(0, color='0.7', linewidth=0.8)
+    ax.axvline(0, color='0.7', linewidth=0.8)
+    ax.set_xlabel('Real')
+    ax.set_ylabel('Imaginary')
+    ax.grid(True)
+    return finish(fig, path)
 
 #### plotting poles and zeros of a multi system
-def plotting_poles_and_zeros_multi_sys(num1, den1, num2, den2):
-    sys1 = ctrl.TransferFunction(num1,den1)
-    sys2 = ctrl.TransferFunction(num2,den2)
+def plotting_poles_and_zeros_multi_sys(num1, den1, num2, den2, *systems, path=None, cancellation_tol=1e-6):
+    """
+    Pole-zero map of num1/den1 + num2/den2 + any further systems ((num, den)
+    pairs or Blocks). The sum is a minimal realization, so exactly cancelling
+    pairs are gone; near cancellations are drawn in red.
+    """
+    # from the Block itself: roots of the coefficients of a large sum are inaccurate
+    block = parallel((num1, den1), (num2, den2), *systems)
+    pz = _cancellations(block.zeros()[None], block.poles()[None], cancellation_tol)
+    return _draw_poles_zeros(pz, path)
+
+#### root locus computed once, queried per K by interpolation
+def _match_branches(roots):
+    """
+    Reorders the roots of every row so that column j follows one continuous branch,
+    assigning each row's roots to the previous row's by minimum total distance.
+    """
+    matched = roots.copy()
+    for k in range(1, roots.shape[0]):
+        cost = np.abs(matched[k - 1][:, None] - roots[k][None, :])
+        cost = np.where(np.isnan(cost), 1e300, cost)
+        _, order = optimize.linear_sum_assignment(cost)
+        matched[k] = roots[k][order]
+    return matched
+
+
+class RootLocus:
+    """
+    Root locus of 1 + K·num/den computed once on an adaptively refined gain grid.
+
+    The closed-loop poles for all grid gains come from one batched eigenvalue
+    solve per refinement pass, are matched into continuous branches, and the grid
+    is refined wherever a branch moves more than `max_step` (relative to the size
+    of the locus) between neighbouring gains. Queries then only interpolate.
+
+    Attributes:
+        gains: (M,) gain grid, starting at 0
+        branches: (M, n) closed-loop poles, one column per branch
+        crossing_gains, crossing_frequencies: gains where a branch crosses the
+            imaginary axis and the crossing frequency |Im s| there
+    """
+
+    @instrument(name="plotting_poles_and_zeros.RootLocus", size=lambda self, num, den, *args, **kwargs: len(den) - 1)
+    def __init__(self, num, den, k_max=None, n_initial=200, max_step=0.02, max_refinements=10):
+        self.num, self.den = (row[0] for row in stack_pair(num, den))
+        scale = np.max(np.abs(self.den)) / np.max(np.abs(self.num))
+        if k_max is None:
+            k_max = 1e4 * scale
+        gains = np.concatenate([[0.0], np.logspace(np.log10(k_max) - 7, np.log10(k_max), n_initial)])
+
+        for _ in range(max_refinements):
+            branches = _match_branches(self._roots(gains))
+            size = max(np.nanmax(np.abs(branches)), 1.0)
+            jump = np.nanmax(np.abs(np.diff(branches, axis=0)), axis=1) / size
+            coarse = np.flatnonzero(jump > max_step)
+            if coarse.size == 0:
+                break
+            lo, hi = gains[coarse], gains[coarse + 1]
+            mid = np.where(lo > 0, np.sqrt(lo * hi), hi / 2)
+            gains = np.sort(np.concatenate([gains, mid]))
+        self.gains = gains
+        self.branches = branches
+        self.crossing_gains, self.crossing_frequencies = self._imaginary_axis_crossings()
+
+    def _roots(self, gains):
+        return batch_roots(self.den[None, :] + np.asarray(gains, dtype=float)[:, None] * self.num[None, :])
+
+    def poles(self, K):
+        """
+        Closed-loop poles at gain K (scalar or array), interpolated along the branches.
+        Gains beyond the precomputed grid are solved directly.
+
+        Returns:
+            (n,) for a scalar K, else (len(K), n)
+        """
+        if np.ndim(K) == 0 and 0 <= K <= self.gains[-1]:
+            i = min(max(int(np.searchsorted(self.gains, K)) - 1, 0), self.gains.size - 2)
+            g0, g1 = self.gains[i], self.gains[i + 1]
+            return self.branches[i] + (K - g0) / (g1 - g0) * (self.branches[i + 1] - self.branches[i])
+
+        K = np.asarray(K, dtype=float)
+        k = np.atleast_1d(K)
+        i = np.clip(np.searchsorted(self.gains, k) - 1, 0, self.gains.size - 2)
+        frac = ((k - self.gains[i]) / (self.gains[i + 1] - self.gains[i]))[:, None]
+        poles = self.branches[i] + frac * (self.branches[i + 1] - self.branches[i])
+        outside = k > self.gains[-1]
+        if outside.any():
+            poles[outside] = self._roots(k[outside])
+        return poles[0] if K.ndim == 0 else poles
+
+    def _imaginary_axis_crossings(self, iterations=60):
+        """Sign changes of the real part of each branch, refined by bisection on K."""
+        real = self.branches.real
+        step, branch = np.nonzero(np.sign(real[1:]) * np.sign(real[:-1]) < 0)
+        lo, hi = self.gains[step], self.gains[step + 1]
+        lo_sign = np.sign(real[step, branch])
+        if step.size == 0:
+            return np.empty(0), np.empty(0)
+        def branch_roots(gains):
+            roots = self._roots(gains)
+            guess = self.poles(gains).reshape(gains.size, -1)[np.arange(gains.size), branch]
+            nearest = np.argmin(np.abs(np.where(np.isnan(roots), np.inf, roots) - guess[:, None]), axis=1)
+            return roots[np.arange(gains.size), nearest]
+
+        for _ in range(iterations):
+            mid = (lo + hi) / 2
+            same = np.sign(branch_roots(mid).real) == lo_sign
+            lo, hi = np.where(same, mid, lo), np.where(same, hi, mid)
+        gains = (lo + hi) / 2
+        frequencies = branch_roots(gains).imag
+        # a complex pair crosses together; report it once, by its upper branch
+        upper = frequencies >= 0
+        order = np.argsort(gains[upper])
+        return gains[upper][order], frequencies[upper][order]
+
+
+@functools.lru_cache(maxsize=128)
+def _cached_root_locus(num, den):
+    return RootLocus(list(num), list(den))
+
+
+def root_locus(num, den):
+    """Cached RootLocus of num/den, computed on first use and reused for every K."""
+    return _cached_root_locus(tuple(np.ravel(num).astype(float)), tuple(np.ravel(den).astype(float)))
 
-    sys = sys1 + sys2 
-    ctrl.pzmap(sys,Plot = True)
-    plt.show()
 
 #### plotting the root locus of the system
-def update_root_locus(num, den, K=1):
-    system = ctrl.TransferFunction(num,den)
+@instrument()
+def update_root_locus(num, den, K=1, path=None):
+    locus = root_locus(num, den)
 
-    plt.figure(figsize=(6, 6))
+    fig, axes = get_axes('root_locus', figsize=(6, 6), path=path)
+    ax = axes[0, 0]
     
-    # Compute closed-loop poles for given K
-    closed_loop = ctrl.feedback(K * system)  
-    poles = ctrl.poles(closed_loop)  
+    # Closed-loop poles for given K from the precomputed locus
+    poles = locus.poles(K)
     
     # Plot root locus
-    ctrl.root_locus(system, grid=True)
+    for branch in locus.branches.T:
+        ax.plot(branch.real, branch.imag, color='C0')
+    open_loop = locus.branches[0]
+    ax.scatter(open_loop.real, open_loop.imag, marker='x', color='C0')
+    zeros = np.roots(locus.num) if np.any(locus.num) else []
+    ax.scatter(np.real(zeros), np.imag(zeros), marker='o', facecolors='none', edgecolors='C0')
+    extent = 2.5 * max(1.0, np.max(np.abs(open_loop)), np.max(np.abs(zeros), initial=0), np.max(np.abs(poles)))
+    ax.set_xlim(-extent, extent)
+    ax.set_ylim(-extent, extent)
+    ax.grid(True)
     
     # Highlight the poles for the given K
-    plt.scatter(np.real(poles), np.imag(poles), color='red', s=100, label=f'Poles at K={K}')
-    plt.show()
+    ax.scatter(np.real(poles), np.imag(poles), color='red', s=100, label=f'Poles at K={K}')
+    return finish(fig, path)
 
 # Interactive slider for gain K
 # interact(update_root_locus, K=(0.01, 300, 0.5))
 
 
-s= sp.symbols('s')
-eq0 =(s+3)*(s+2)
-eq1 = (s+6)*(s+5)
-
-n = sp.expand(eq0)
-d = sp.expand(eq1)
-print(f'n = {n}, d = {d}')
-
-
-num = [1,5,6]
-den = [1,11,30]
+# s= sp.symbols('s')
+# eq0 =(s+3)*(s+2)
+# eq1 = (s+6)*(s+5)
+# print(f'n = {sp.expand(eq0)}, d = {sp.expand(eq1)}')
 
+# num = [1,5,6]
+# den = [1,11,30]
 # plotting_poles_zeros(num, den)
 
 # num1 = [-10,10]
@@ -0,0 +1,95 @@
+import numpy as np
+
+from .instrumentation import instrument
+
+
+#### stacking coefficient lists of many systems into one array
+def stack_coefficients(coeff_sets):
+    """
+    Stacks N polynomial coefficient lists (highest power first, as for
+    ctrl.TransferFunction) into an (N, max_degree + 1) array, padding
+    lower-degree polynomials with leading zeros.
+
+    A single flat coefficient list is treated as one polynomial.
+    """
+    if np.isscalar(coeff_sets[0]):
+        coeff_sets = [coeff_sets]
+    coeff_sets = [np.atleast_1d(np.asarray(c, dtype=float)) for c in coeff_sets]
+    width = max(c.size for c in coeff_sets)
+    stacked = np.zeros((len(coeff_sets), width))
+    for i, c in enumerate(coeff_sets):
+        stacked[i, width - c.size:] = c
+    return stacked
+
+
+def stack_pair(nums, dens):
+    """
+    Stacks numerator and denominator coefficient lists of N systems to one
+    common width, so column j holds the same power of s in both arrays.
+    """
+    num, den = stack_coefficients(nums), stack_coefficients(dens)
+    width = max(num.shape[1], den.shape[1])
+    num = np.pad(num, ((0, 0), (width - num.shape[1], 0)))
+    den = np.pad(den, ((0, 0), (width - den.shape[1], 0)))
+    if num.shape[0] != den.shape[0]:
+        num, den = np.broadcast_arrays(num, den)
+    return num, den
+
+
+def polyval_batch(coeffs, x):
+    """
+    Evaluates every row of an (N, d + 1) coefficient array with Horner's rule,
+    looping over the degree rather than the systems. x is either a shared
+    1-D array of points or an (N, M) array with separate points per row.
+
+    Returns:
+        An (N, len(x)) or (N, M) array
+    """
+    x = np.asarray(x)
+    values = np.zeros((coeffs.shape[0],) + x.shape[-1:], dtype=np.result_type(coeffs, x))
+    for column in coeffs.T:
+        values = values * x + column[:, None]
+    return values
+
+
+def polymul_batch(a, b):
+    """
+    Row-wise product of two stacks of polynomials, (N, p) and (N, q) coefficient
+    arrays in the same power order, giving an (N, p + q - 1) array.
+    Either argument may have a single row, which is broadcast.
+    """
+    a, b = np.atleast_2d(a), np.atleast_2d(b)
+    rows = max(a.shape[0], b.shape[0])
+    out = np.zeros((rows, a.shape[1] + b.shape[1] - 1), dtype=np.result_type(a, b))
+    for j in range(b.shape[1]):
+        out[:, j:j + a.shape[1]] += a * b[:, j:j + 1]
+    return out
+
+
+#### roots of many polynomials through batched companion-matrix eigenvalues
+@instrument(size=lambda coeffs: np.size(coeffs))
+def batch_roots(coeffs):
+    """
+    Roots of every row of an (N, d + 1) coefficient array (highest power first).
+
+    Rows are grouped by their actual degree (leading zeros dropped) and each group
+    is solved with one stacked eigenvalue call on its companion matrices.
+
+    Returns:
+        An (N, d) complex array, padded with NaN where a row has fewer than d roots
+    """
+    coeffs = np.atleast_2d(np.asarray(coeffs, dtype=float))
+    n_rows, width = coeffs.shape
+    roots = np.full((n_rows, width - 1), np.nan, dtype=complex)
+    nonzero = coeffs != 0
+    degrees = np.where(nonzero.any(axis=1), width - 1 - np.argmax(nonzero, axis=1), 0)
+    for degree in np.unique(degrees):
+        if degree == 0:
+            continue
+        rows = np.flatnonzero(degrees == degree)
+        c = coeffs[rows, width - 1 - degree:]
+        companion = np.zeros((rows.size, degree, degree))
+        companion[:, 0, :] = -c[:, 1:] / c[:, :1]
+        companion[:, np.arange(1, degree), np.arange(degree - 1)] = 1.0
+        roots[rows, :degree] = np.linalg.eigvals(companion)
+    return roots
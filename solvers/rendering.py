@@ -0,0 +1,94 @@
+import os
+from functools import partial
+
+from .instrumentation import stage
+
+#### off-screen figures reused across calls, one per (plot kind, layout)
+_FIGURES = {}
+
+
+def get_axes(key, nrows=1, figsize=None, path=None):
+    """
+    Returns (fig, axes) for a plotting helper, axes being an (nrows, 1) array.
+
+    Without a path a new pyplot figure is created for interactive display, as before.
+    With a path the figure is an off-screen Agg figure that is cached per key and
+    cleared on reuse, so batch rendering neither touches the GUI backend nor
+    leaks one figure per call.
+    """
+    if path is None:
+        import matplotlib.pyplot as plt
+        return plt.subplots(nrows, 1, figsize=figsize, squeeze=False)
+
+    cache_key = (key, nrows, figsize)
+    if cache_key not in _FIGURES:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        _FIGURES[cache_key] = fig, fig.subplots(nrows, 1, squeeze=False)
+    fig, axes = _FIGURES[cache_key]
+    for ax in axes.flat:
+        ax.clear()
+    fig.suptitle("")
+    return fig, axes
+
+
+def finish(fig, path=None, **savefig_kwargs):
+    """
+    Shows the figure interactively, or writes it to path (PNG, SVG, ... from the
+    extension), creating its directory when needed.
+
+    Returns:
+        The path written, or None when shown interactively
+    """
+    if path is None:
+        import matplotlib.pyplot as plt
+        with stage("matplotlib.show"):
+            plt.show()
+        return None
+    if isinstance(path, (str, os.PathLike)) and os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with stage("matplotlib.savefig"):
+        fig.savefig(path, **savefig_kwargs)
+    return path
+
+
+def clear_figure_cache():
+    """Drops the cached off-screen figures."""
+    _FIGURES.clear()
+
+
+#### batch rendering
+def _use_agg():
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def _render_job(func, job):
+    args, path = job
+    func(*args, path=path)
+    return path
+
+
+def render_batch(func, jobs, processes=None, chunksize=16):
+    """
+    Renders many plots of one kind to files.
+
+    Args:
+        func: a plotting helper accepting path=..., e.g. system_step_response
+        jobs: iterable of (args, path) pairs, e.g. [((num, den), "loop_001.png"), ...]
+        processes: worker processes; None or 1 renders serially in this interpreter,
+            0 uses one worker per CPU core
+        chunksize: jobs handed to a worker at a time
+
+    Returns:
+        List of the written paths, in job order
+    """
+    jobs = list(jobs)
+    if processes in (None, 1):
+        return [_render_job(func, job) for job in jobs]
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=processes or os.cpu_count(), initializer=_use_agg) as pool:
+        return list(pool.map(partial(_render_job, func), jobs, chunksize=chunksize))
@@ -0,0 +1,395 @@
+import numpy as np
+from ._lazy import lazy_import
+
+pd = lazy_import("pandas")
+sp = lazy_import("sympy")
+
+
+#### compact result objects returned by the solvers; printing is left to the caller
+class Result:
+    """
+    Base of the single-system results: fixed fields in __slots__, a text form for
+    presentation (str / show()) and as_dict() for further processing.
+    """
+    __slots__ = ()
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__ if not name.startswith('_')}
+
+    def show(self):
+        """Prints the result the way the solver used to, and returns it."""
+        print(self)
+        if getattr(self, 'approximate', False):
+            print("(approximate: the symbolic budget ran out, computed numerically)")
+        return self
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={value!r}" for name, value in self.as_dict().items())
+        return f"{type(self).__name__}({fields})"
+
+
+class Batch:
+    """
+    Base of the array-backed containers for many systems: every field is an array
+    with one entry (row) per system. batch[i] gives the single-system result of
+    row i, batch['field'] the whole array, and the container unpacks into its
+    arrays in field order, e.g. `gm, pm, wcg, wcp = batch`.
+    """
+    __slots__ = ()
+    row_type = None
+
+    def __iter__(self):
+        return (getattr(self, name) for name in self.__slots__)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return getattr(self, key)
+        return self.row_type(*(getattr(self, name)[key] for name in self.__slots__))
+
+    @property
+    def size(self):
+        return len(getattr(self, self.__slots__[0]))
+
+    def to_frame(self):
+        """One DataFrame row per system; 2-D fields become one column per entry."""
+        columns = {}
+        for name in self.__slots__:
+            values = np.asarray(getattr(self, name))
+            if values.ndim == 1:
+                columns[name] = values
+            else:
+                for j in range(values.shape[1]):
+                    columns[f"{name}_{j}"] = values[:, j]
+        return pd.DataFrame(columns)
+
+    def __repr__(self):
+        return f"{type(self).__name__}(size={self.size}, fields={self.__slots__})"
+
+
+#### frequency domain
+class Margins(Result):
+    """
+    Gain margin (absolute ratio), phase margin (degrees), phase crossover frequency
+    (where the gain margin is read) and gain crossover frequency (where the phase
+    margin is read), in rad/s.
+    """
+    __slots__ = ('gain_margin', 'phase_margin', 'phase_crossover', 'gain_crossover')
+
+    def __init__(self, gain_margin, phase_margin, phase_crossover, gain_crossover):
+        self.gain_margin = gain_margin
+        self.phase_margin = phase_margin
+        self.phase_crossover = phase_crossover
+        self.gain_crossover = gain_crossover
+
+    def __str__(self):
+        return (f"gain margin = {self.gain_margin}, phase margin = {self.phase_margin}, "
+                f"gain frequency = {self.gain_crossover}, phase frequency = {self.phase_crossover}")
+
+
+class MarginsBatch(Batch):
+    """Margins of N systems, each field an (N,) array (see Margins)."""
+    __slots__ = ('gain_margin', 'phase_margin', 'phase_crossover', 'gain_crossover')
+    row_type = Margins
+
+    def __init__(self, gain_margin, phase_margin, phase_crossover, gain_crossover):
+        self.gain_margin = gain_margin
+        self.phase_margin = phase_margin
+        self.phase_crossover = phase_crossover
+        self.gain_crossover = gain_crossover
+
+
+class Crossovers(Result):
+    """
+    Every gain crossover (with its phase margin, degrees) and every -180° phase
+    crossover (with its gain margin, absolute ratio) of one system, in rad/s and
+    sorted by frequency; gain_value is the swept gain (None without a sweep).
+    """
+    __slots__ = ('gain_value', 'gain_crossovers', 'phase_margins', 'phase_crossovers', 'gain_margins')
+
+    def __init__(self, gain_value, gain_crossovers, phase_margins, phase_crossovers, gain_margins):
+        self.gain_value = gain_value
+        self.gain_crossovers = gain_crossovers
+        self.phase_margins = phase_margins
+        self.phase_crossovers = phase_crossovers
+        self.gain_margins = gain_margins
+
+    def __str__(self):
+        prefix = "" if self.gain_value is None else f"gain = {self.gain_value}: "
+        return (f"{prefix}gain crossovers = {self.gain_crossovers}, phase margins = {self.phase_margins}, "
+                f"phase crossovers = {self.phase_crossovers}, gain margins = {self.gain_margins}")
+
+
+class CrossoversBatch(Batch):
+    """
+    Crossovers of K systems (one per swept gain value): gain_values (K,), or None
+    without a sweep, and (K, m) / (K, p) arrays of gain_crossovers, phase_margins,
+    phase_crossovers and gain_margins, sorted by frequency and NaN-padded.
+    Row i drops the padding.
+    """
+    __slots__ = ('gain_values', 'gain_crossovers', 'phase_margins', 'phase_crossovers', 'gain_margins')
+
+    def __init__(self, gain_values, gain_crossovers, phase_margins, phase_crossovers, gain_margins):
+        self.gain_values = gain_values
+        self.gain_crossovers = gain_crossovers
+        self.phase_margins = phase_margins
+        self.phase_crossovers = phase_crossovers
+        self.gain_margins = gain_margins
+
+    @property
+    def size(self):
+        return len(self.gain_crossovers)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return getattr(self, key)
+        w_c, w_p = self.gain_crossovers[key], self.phase_crossovers[key]
+        if np.ndim(w_c) > 1:
+            raise IndexError("index a single system; slice the arrays for several")
+        has_c, has_p = ~np.isnan(w_c), ~np.isnan(w_p)
+        return Crossovers(None if self.gain_values is None else self.gain_values[key],
+                          w_c[has_c], self.phase_margins[key][has_c], w_p[has_p], self.gain_margins[key][has_p])
+
+    def to_frame(self):
+        columns = {} if self.gain_values is None else {'gain_values': self.gain_values}
+        for name in self.__slots__[1:]:
+            values = getattr(self, name)
+            for j in range(values.shape[1]):
+                columns[f"{name}_{j}"] = values[:, j]
+        return pd.DataFrame(columns)
+
+
+class PhaseMargin(Result):
+    """
+    Gain crossover frequency (rad/s) and phase margin (degrees); NaN when there is
+    no crossover. approximate marks results computed numerically after the
+    symbolic budget ran out (the same holds for the other symbolic results).
+    """
+    __slots__ = ('crossover_frequency', 'phase_margin', 'approximate')
+
+    def __init__(self, crossover_frequency, phase_margin, approximate=False):
+        self.crossover_frequency = crossover_frequency
+        self.phase_margin = phase_margin
+        self.approximate = approximate
+
+    @property
+    def found(self):
+        return not np.isnan(float(self.crossover_frequency))
+
+    def __str__(self):
+        if not self.found:
+            return "No valid gain crossover frequency found."
+        return (f"Cross-over frequency: {float(self.crossover_frequency):.3f} rad/s, "
+                f"Phase margin: {float(self.phase_margin):.2f} degrees")
+
+
+class FrequencySplit(Result):
+    """
+    Re and Im of G(jω) as sympy expressions in w, with a NumPy evaluator:
+    calling the result, split(omega, **parameters), returns (real, imag) arrays.
+    """
+    __slots__ = ('real', 'imag', 'approximate', '_evaluate')
+
+    def __init__(self, real, imag, evaluate, approximate=False):
+        self.real = real
+        self.imag = imag
+        self._evaluate = evaluate
+        self.approximate = approximate
+
+    def __call__(self, omega, **parameters):
+        return self._evaluate(omega, **parameters)
+
+    def __reduce__(self):
+        # the compiled evaluator does not pickle; it is rebuilt on load
+        return _frequency_result, (FrequencySplit, self.approximate, self.real, self.imag)
+
+    def __str__(self):
+        return f'Real part: {self.real}, Imaginary part: {self.imag}'
+
+
+class Magnitude(Result):
+    """|G(jω)| as a sympy expression in w; calling the result evaluates it on an ω array."""
+    __slots__ = ('expression', 'approximate', '_evaluate')
+
+    def __init__(self, expression, evaluate, approximate=False):
+        self.expression = expression
+        self._evaluate = evaluate
+        self.approximate = approximate
+
+    def __call__(self, omega, **parameters):
+        return self._evaluate(omega, **parameters)[0]
+
+    def __reduce__(self):
+        return _frequency_result, (Magnitude, self.approximate, self.expression)
+
+    def __str__(self):
+        return f'Magnitude: {self.expression}'
+
+
+def _frequency_result(kind, approximate, *exprs):
+    from .sympy_solvers import _frequency_evaluator
+    return kind(*exprs, _frequency_evaluator(exprs, sp.symbols('w', real=True)), approximate)
+
+
+#### poles, zeros and closed loops
+class PolesZeros(Result):
+    """
+    Zeros and poles of one system: sympy roots in exact mode, complex arrays in
+    numeric mode, where cancelled_poles / cancelled_zeros mark near cancellations.
+    """
+    __slots__ = ('zeros', 'poles', 'cancelled_zeros', 'cancelled_poles', 'approximate')
+
+    def __init__(self, zeros, poles, cancelled_zeros=None, cancelled_poles=None, approximate=False):
+        self.zeros = zeros
+        self.poles = poles
+        self.cancelled_zeros = cancelled_zeros
+        self.cancelled_poles = cancelled_poles
+        self.approximate = approximate
+
+    def __str__(self):
+        text = f'Zeros: {self.zeros}, Poles: {self.poles}'
+        if self.cancelled_poles is not None and np.any(self.cancelled_poles):
+            text += f'\nNear pole-zero cancellations at: {np.asarray(self.poles)[self.cancelled_poles]}'
+        return text
+
+
+class PolesZerosBatch(Batch):
+    """
+    Poles and zeros of N systems: poles (N, n) and zeros (N, m) complex arrays,
+    NaN-padded, with the (N, n) / (N, m) near-cancellation masks.
+    Row i drops the padding.
+    """
+    __slots__ = ('zeros', 'poles', 'cancelled_zeros', 'cancelled_poles')
+
+    def __init__(self, zeros, poles, cancelled_zeros, cancelled_poles):
+        self.zeros = zeros
+        self.poles = poles
+        self.cancelled_zeros = cancelled_zeros
+        self.cancelled_poles = cancelled_poles
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return getattr(self, key)
+        zeros, poles = self.zeros[key], self.poles[key]
+        if np.ndim(zeros) > 1:
+            raise IndexError("index a single system; slice the arrays for several")
+        has_zero, has_pole = ~np.isnan(zeros), ~np.isnan(poles)
+        return PolesZeros(zeros[has_zero], poles[has_pole],
+                          self.cancelled_zeros[key][has_zero], self.cancelled_poles[key][has_pole])
+
+
+class FeedbackResult(Result):
+    """Closed loop C·G/(1 + C·G): numerator and denominator coefficients and the ctrl.TransferFunction."""
+    __slots__ = ('num', 'den', 'system')
+
+    def __init__(self, num, den, system):
+        self.num = num
+        self.den = den
+        self.system = system
+
+    @property
+    def poles(self):
+        return np.roots(self.den)
+
+    def __str__(self):
+        return f"feedback system :{self.system}"
+
+
+class StabilityPoint(Result):
+    """Closed-loop stability at one grid point: its parameter values, stable, spectral abscissa and damping."""
+    __slots__ = ('parameters', 'stable', 'spectral_abscissa', 'damping')
+
+    def __init__(self, parameters, stable, spectral_abscissa, damping):
+        self.parameters = parameters
+        self.stable = stable
+        self.spectral_abscissa = spectral_abscissa
+        self.damping = damping
+
+    def __str__(self):
+        state = "stable" if self.stable else "unstable"
+        return (f"{self.parameters}: {state}, spectral abscissa = {self.spectral_abscissa}, "
+                f"damping = {self.damping}")
+
+
+class StabilityMap(Batch):
+    """
+    Closed-loop stability over a parameter grid: grid (the np.meshgrid arrays,
+    ij indexing), and stable, spectral_abscissa (largest pole real part) and
+    damping (smallest damping ratio) arrays of the grid's shape. map[i, j] gives
+    the StabilityPoint at that grid index, to_frame() one row per grid point.
+    """
+    __slots__ = ('grid', 'stable', 'spectral_abscissa', 'damping')
+
+    def __init__(self, grid, stable, spectral_abscissa, damping):
+        self.grid = grid
+        self.stable = stable
+        self.spectral_abscissa = spectral_abscissa
+        self.damping = damping
+
+    @property
+    def size(self):
+        return self.stable.size
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return getattr(self, key)
+        if np.ndim(self.stable[key]) > 0:
+            raise IndexError("index a single grid point; slice the arrays for several")
+        return StabilityPoint(tuple(float(g[key]) for g in self.grid), bool(self.stable[key]),
+                              float(self.spectral_abscissa[key]), float(self.damping[key]))
+
+    def to_frame(self):
+        columns = {f"parameter_{j}": g.ravel() for j, g in enumerate(self.grid)}
+        for name in ('stable', 'spectral_abscissa', 'damping'):
+            columns[name] = getattr(self, name).ravel()
+        return pd.DataFrame(columns)
+
+
+#### symbolic results
+class Decomposition(Result):
+    """Partial fraction decomposition: the whole expression and its additive terms."""
+    __slots__ = ('expression', 'terms', 'approximate')
+
+    def __init__(self, expression, approximate=False):
+        self.expression = expression
+        self.terms = sp.Add.make_args(expression)
+        self.approximate = approximate
+
+    def __str__(self):
+        return f"The decomposition is: {self.expression}"
+
+
+class ExpressionResult(Result):
+    """A single sympy expression (inverse transform, linearization), printed plainly or pretty."""
+    __slots__ = ('expression', 'pretty', 'approximate')
+
+    def __init__(self, expression, pretty=False, approximate=False):
+        self.expression = expression
+        self.pretty = pretty
+        self.approximate = approximate
+
+    def __str__(self):
+        return sp.pretty(self.expression) if self.pretty else str(self.expression)
+
+
+#### batch symbolic jobs
+class SymbolicJobResult(Result):
+    """
+    Outcome of one job of a symbolic batch: its position in the batch, the
+    operation, the solver's result object (None on error), whether the numeric
+    fallback produced it (approximate), the wall time and the error text, if any.
+    """
+    __slots__ = ('index', 'operation', 'value', 'approximate', 'elapsed', 'error')
+
+    def __init__(self, index, operation, value, approximate=False, elapsed=0.0, error=None):
+        self.index = index
+        self.operation = operation
+        self.value = value
+        self.approximate = approximate
+        self.elapsed = elapsed
+        self.error = error
+
+    def __str__(self):
+        if self.error is not None:
+            return f"[{self.index}] {self.operation} failed: {self.error}"
+        flag = " (approximate)" if self.approximate else ""
+        return f"[{self.index}] {self.operation}{flag}: {self.value}"
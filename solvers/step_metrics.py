@@ -0,0 +1,90 @@
+import numpy as np
+from ._lazy import lazy_import
+from .instrumentation import instrument
+
+pd = lazy_import("pandas")
+
+# np.trapz was renamed np.trapezoid in numpy 2.0
+_trapezoid = getattr(np, 'trapezoid', None) or np.trapz
+
+
+#### step-response metrics for many systems at once
+def _first_crossing_time(t, values, level):
+    """
+    Time at which each row first reaches `level`, linearly interpolated between
+    samples; NaN for rows that never reach it.
+    """
+    reached = values >= level
+    k = np.argmax(reached, axis=1)
+    rows = np.arange(values.shape[0])
+    prev = np.maximum(k - 1, 0)
+    v0, v1 = values[rows, prev], values[rows, k]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        frac = np.where((k > 0) & (v1 != v0), (level - v0) / (v1 - v0), 0.0)
+    time = t[rows, prev] + frac * (t[rows, k] - t[rows, prev])
+    return np.where(reached.any(axis=1), time, np.nan)
+
+
+@instrument(size=lambda t, y, *args, **kwargs: np.size(y))
+def step_metrics(t, y, setpoint=1.0, settling_band=0.02, rise_limits=(0.1, 0.9)):
+    """
+    Rise time, peak time, overshoot, settling time, steady-state error and IAE/ISE
+    of step responses, computed on whole arrays without a per-system loop.
+
+    The response is normalized by its own change (final - initial value), so
+    negative-gain processes are handled the same way as positive ones. The last
+    sample is taken as the final value.
+
+    Args:
+        t: time samples, shape (n_samples,) or (n_systems, n_samples)
+        y: responses, shape (n_systems, n_samples)
+        setpoint: reference for the error integrals and steady-state error,
+            scalar or one value per system (default=1.0)
+        settling_band: settling tolerance as a fraction of the change (default=0.02)
+        rise_limits: fractions of the change between which the rise time is measured
+
+    Returns:
+        A DataFrame with one row per system and the columns rise_time, peak_time,
+        overshoot (% of the change), settling_time, steady_state_error, iae, ise
+    """
+    y = np.atleast_2d(np.asarray(y, dtype=float))
+    t = np.broadcast_to(np.asarray(t, dtype=float), y.shape)
+    rows = np.arange(y.shape[0])
+    setpoint = np.broadcast_to(np.asarray(setpoint, dtype=float), rows.shape)
+
+    final = y[:, -1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        normalized = (y - y[:, :1]) / (final - y[:, 0])[:, None]
+
+    low, high = rise_limits
+    rise_time = _first_crossing_time(t, normalized, high) - _first_crossing_time(t, normalized, low)
+
+    peak = np.argmax(normalized, axis=1)
+    peak_time = t[rows, peak]
+    overshoot = np.maximum(normalized[rows, peak] - 1.0, 0.0) * 100
+
+    outside = np.abs(normalized - 1.0) > settling_band
+    last_outside = y.shape[1] - 1 - np.argmax(outside[:, ::-1], axis=1)
+    settled = last_outside < y.shape[1] - 1
+    settling_time = np.where(~outside.any(axis=1), t[:, 0],
+                             np.where(settled, t[rows, np.minimum(last_outside + 1, y.shape[1] - 1)], np.nan))
+
+    error = setpoint[:, None] - y
+    iae = _trapezoid(np.abs(error), t, axis=1)
+    ise = _trapezoid(error**2, t, axis=1)
+
+    return pd.DataFrame({
+        'rise_time': rise_time,
+        'peak_time': peak_time,
+        'overshoot': overshoot,
+        'settling_time': settling_time,
+        'steady_state_error': setpoint - final,
+        'iae': iae,
+        'ise': ise,
+    })
+
+
+#### how to use
+# t, y = step_responses(nums, dens)
+# metrics = step_metrics(t, y)
+# metrics.sort_values('iae').head(20) ####### worst/best loops first
@@ -1,39 +1,217 @@
 import numpy as np
-import sympy as sp
-import matplotlib.pyplot as plt
-import control as ctrl 
+from ._lazy import lazy_import
+from .delay import pade
+from .instrumentation import instrument
+from .polynomials import batch_roots, stack_coefficients, stack_pair
+from .rendering import finish, get_axes
 
-#### h1 system step response plotting
+linalg = lazy_import("scipy.linalg")
+
+
+#### batched step responses with an adaptive horizon, no plotting
+@instrument(size=lambda nums, dens: np.shape(stack_coefficients(dens))[0])
+def companion_state_space(nums, dens):
+    """
+    Controllable canonical realizations of N proper transfer functions, all padded
+    to the largest order n. A system of lower order occupies the top-left block;
+    its extra states have no input and no output coupling.
+
+    Returns:
+        A (N, n, n), B (N, n), C (N, n), D (N,)
+    """
+    num, den = stack_pair(nums, dens)
+    count, width = den.shape
+    nonzero = den != 0
+    if not nonzero.any(axis=1).all():
+        raise ValueError("zero denominator")
+    orders = width - 1 - np.argmax(nonzero, axis=1)
+    num_orders = np.where((num != 0).any(axis=1), width - 1 - np.argmax(num != 0, axis=1), 0)
+    if np.any(num_orders > orders):
+        raise ValueError("improper transfer function (numerator order above denominator order)")
+    n = max(int(orders.max()), 1)
+
+    A = np.zeros((count, n, n))
+    B = np.zeros((count, n))
+    C = np.zeros((count, n))
+    D = np.zeros(count)
+    for k in np.unique(orders):
+        idx = np.flatnonzero(orders == k)
+        # b_0 s^k + ... + b_k over monic s^k + a_1 s^(k-1) + ... + a_k
+        lead = den[idx, width - k - 1:width - k]
+        a = den[idx, width - k - 1:] / lead
+        b = num[idx, width - k - 1:] / lead
+        D[idx] = b[:, 0]
+        if k == 0:
+            continue
+        A[idx, 0, :k] = -a[:, 1:]
+        A[idx[:, None], np.arange(1, k), np.arange(k - 1)] = 1.0
+        B[idx, 0] = 1.0
+        C[idx, :k] = b[:, 1:] - b[:, :1] * a[:, 1:]
+    return A, B, C, D
+
+
+def step_horizon(dens, settle=7.0, samples_per_time_constant=20, n_min=200, n_max=20000, default=50.0):
+    """
+    Picks a simulation horizon per system and a shared sample count from the poles.
+
+    The horizon is `settle` times the slowest stable time constant (1/|Re p|), so the
+    slowest mode has decayed to about e^-settle. The sample count resolves the fastest
+    pole (|p|) with `samples_per_time_constant` points. Systems without stable poles
+    fall back to `default` seconds.
+
+    Returns:
+        t_final (N,), n_samples
+    """
+    return _pole_horizon(batch_roots(stack_coefficients(dens)), settle, samples_per_time_constant,
+                         n_min, n_max, default)
+
+
+def _pole_horizon(poles, settle=7.0, samples_per_time_constant=20, n_min=200, n_max=20000, default=50.0):
+    """step_horizon from (N, n) pole arrays, NaN-padded."""
+    stable = np.where(poles.real < -1e-9, -poles.real, np.nan)
+    slowest = np.min(np.where(np.isnan(stable), np.inf, stable), axis=1, initial=np.inf)
+    t_final = np.where(np.isfinite(slowest), settle / slowest, default)
+
+    fastest = np.max(np.where(np.isnan(poles), 0.0, np.abs(poles)), axis=1, initial=0.0)
+    needed = np.ceil(t_final * np.maximum(fastest, 1.0 / t_final) * samples_per_time_constant)
+    n_samples = int(np.clip(needed.max(), n_min, n_max))
+    return t_final, n_samples
+
+
+def zoh_discretize(A, B, dt):
+    """
+    Zero-order-hold discretization of N single-input systems with one batched
+    matrix exponential of the augmented matrices [[A, B], [0, 0]].
+
+    Args:
+        A (N, n, n), B (N, n): continuous-time matrices, e.g. from companion_state_space
+        dt: sample time, scalar or one per system
+
+    Returns:
+        Ad (N, n, n), Bd (N, n)
+    """
+    count, n = B.shape
+    dt = np.broadcast_to(np.asarray(dt, dtype=float), (count,))
+    augmented = np.zeros((count, n + 1, n + 1))
+    augmented[:, :n, :n] = A
+    augmented[:, :n, n] = B
+    discrete = linalg.expm(augmented * dt[:, None, None])
+    return discrete[:, :n, :n], discrete[:, :n, n]
 
-def system_step_response(num1, den1):
-    sys = ctrl.TransferFunction(num1,den1)
 
-    t = np.linspace(0,50,10000)
-    t,y = ctrl.step_response(sys,t)
+def _with_delays(nums, dens, delays, order):
+    """Multiplies cached Padé approximations of the delays into each system."""
+    delays = np.broadcast_to(np.asarray(delays, dtype=float), (len(dens),))
+    nums, dens = list(nums), list(dens)
+    for i, delay in enumerate(delays):
+        if delay > 0:
+            num_d, den_d = pade(float(delay), order)
+            nums[i] = np.polymul(nums[i], num_d)
+            dens[i] = np.polymul(dens[i], den_d)
+    return nums, dens
 
-    plt.plot(t,y, label = 'step response')
-    plt.xlabel('Time (s)')
-    plt.ylabel('y(t)')
-    plt.grid(which = 'both', linewidth = 0.5)
-    plt.legend()
-    plt.show()
+
+@instrument(size=lambda nums, dens, *args, **kwargs: np.shape(stack_coefficients(dens))[0])
+def step_responses(nums, dens, t_final=None, n_samples=None, delays=None, pade_order=8):
+    """
+    Step responses of N systems simulated together.
+
+    All systems share one padded state-space form and are discretized with a
+    batched matrix exponential (zero-order hold, exact for a step input), then
+    stepped forward together. Each system gets its own time spacing over the
+    same number of samples.
+
+    Args:
+        nums, dens: N numerator / denominator coefficient lists (highest power first)
+        t_final: horizon in seconds, scalar or per system (default: from step_horizon)
+        n_samples: samples per response (default: from step_horizon)
+        delays: optional time delays, scalar or one per system, realized with
+            cached Padé approximations of order pade_order
+
+    Returns:
+        t (N, n_samples), y (N, n_samples)
+    """
+    if np.isscalar(dens[0]):
+        nums, dens = [nums], [dens]
+    if delays is not None:
+        horizon_dens = dens
+        nums, dens = _with_delays(nums, dens, delays, pade_order)
+    A, B, C, D = companion_state_space(nums, dens)
+    count, n = B.shape
+    auto_t_final, auto_n_samples = step_horizon(dens if delays is None else horizon_dens)
+    if delays is not None:
+        auto_t_final = auto_t_final + np.broadcast_to(np.asarray(delays, dtype=float), (count,))
+    t_final = auto_t_final if t_final is None else np.broadcast_to(np.asarray(t_final, dtype=float), (count,))
+    n_samples = auto_n_samples if n_samples is None else int(n_samples)
+    return _simulate_steps(A, B, C, D, t_final, n_samples)
+
+
+def state_space_step_responses(A, B, C, D, t_final=None, n_samples=None):
+    """
+    Step responses of N single-input single-output state-space systems, with the
+    horizon chosen from the eigenvalues of A as in step_horizon. Used for composed
+    Blocks, whose polynomial coefficients would lose the accuracy of the realization.
+
+    Args:
+        A (N, n, n), B (N, n), C (N, n), D (N,): continuous-time matrices
+        t_final, n_samples: as for step_responses
+
+    Returns:
+        t (N, n_samples), y (N, n_samples)
+    """
+    A, B, C = (np.asarray(m, dtype=float) for m in (A, B, C))
+    D = np.asarray(D, dtype=float).reshape(-1)
+    count = B.shape[0]
+    poles = np.linalg.eigvals(A) if B.shape[1] else np.zeros((count, 0), dtype=complex)
+    auto_t_final, auto_n_samples = _pole_horizon(poles)
+    t_final = auto_t_final if t_final is None else np.broadcast_to(np.asarray(t_final, dtype=float), (count,))
+    n_samples = auto_n_samples if n_samples is None else int(n_samples)
+    return _simulate_steps(A, B, C, D, t_final, n_samples)
+
+
+def _simulate_steps(A, B, C, D, t_final, n_samples):
+    count, n = B.shape
+    dt = t_final / (n_samples - 1)
+    Ad, Bd = zoh_discretize(A, B, dt)
+
+    x = np.zeros((count, n))
+    y = np.empty((count, n_samples))
+    for k in range(n_samples):
+        y[:, k] = np.einsum('ij,ij->i', C, x) + D
+        x = np.einsum('ijk,ik->ij', Ad, x) + Bd
+    t = dt[:, None] * np.arange(n_samples)
+    return t, y
+
+#### h1 system step response plotting
+
+def system_step_response(num1, den1, path=None):
+    t, y = step_responses([num1], [den1])
+    t, y = t[0], y[0]
+
+    fig, axes = get_axes('step_response', path=path)
+    ax = axes[0, 0]
+    ax.plot(t,y, label = 'step response')
+    ax.set_xlabel('Time (s)')
+    ax.set_ylabel('y(t)')
+    ax.grid(which = 'both', linewidth = 0.5)
+    ax.legend()
+    return finish(fig, path)
 
 
 #### h1 + h2 system ste presonse plotting
-def multi_system_step_response(num1, den1, num2, den2):
-    sys1 = ctrl.TransferFunction(num1,den1)
-    sys2 = ctrl.TransferFunction(num2,den2)
-    sys = sys1 + sys2
-
-    t = np.linspace(0,50,10000)
-    t,y = ctrl.step_response(sys,t)
-
-    plt.plot(t,y, label = 'step response')
-    plt.xlabel('Time (s)')
-    plt.ylabel('y(t)')
-    plt.grid(which = 'both', linewidth = 0.5)
-    plt.legend()
-    plt.show()
+def multi_system_step_response(num1, den1, num2, den2, *systems, path=None):
+    """Step response of num1/den1 + num2/den2 + any further systems, summed in state space."""
+    from .composition import parallel
+    t, y = parallel((num1, den1), (num2, den2), *systems).step_response()
+
+    fig, axes = get_axes('step_response', path=path)
+    ax = axes[0, 0]
+    ax.plot(t,y, label = 'step response')
+    ax.set_xlabel('Time (s)')
+    ax.set_ylabel('y(t)')
+    ax.grid(which = 'both', linewidth = 0.5)
+    ax.legend()
+    return finish(fig, path)
 
 # num1 = [-10,10]
 # den1 = [1,2.5,1]
@@ -0,0 +1,112 @@
+import os
+import time
+
+from ._deadline import SolverTimeout, time_limit
+from ._lazy import lazy_import
+from .budget import BudgetExceeded, SolverBudget
+from .results import SymbolicJobResult
+from .sympy_solvers import (find_magnitude, find_phase_margin, find_poles_and_zeros,
+                            inverse_laplace_transform, partial_fraction_decomposition, split_system)
+
+sp = lazy_import("sympy")
+signal = lazy_import("scipy.signal")
+
+#### operations a batch can run; each degrades to its numeric equivalent past the budget
+_OPERATIONS = {
+    'partial_fraction_decomposition': partial_fraction_decomposition,
+    'inverse_laplace_transform': inverse_laplace_transform,
+    'split_system': split_system,
+    'find_magnitude': find_magnitude,
+    'find_poles_and_zeros': find_poles_and_zeros,
+    'find_phase_margin': find_phase_margin,
+}
+
+
+def _error_text(exc):
+    return str(exc) if isinstance(exc, (SolverTimeout, BudgetExceeded)) else f"{type(exc).__name__}: {exc}"
+
+
+def _run_job(index, operation, args, budget):
+    """
+    Runs one job within its budget. The exact computation gets budget.seconds
+    and its numeric fallback as long again; past that the job is given up.
+    """
+    start = time.perf_counter()
+    limit = None if budget.seconds is None else 2 * budget.seconds
+    try:
+        with time_limit(limit):
+            value = _OPERATIONS[operation](*args, verbose=False, budget=budget)
+    except (SolverTimeout, Exception) as exc:
+        return SymbolicJobResult(index, operation, None, False, time.perf_counter() - start, _error_text(exc))
+    return SymbolicJobResult(index, operation, value, value.approximate, time.perf_counter() - start)
+
+
+def _load_modules():
+    # finish the lazy imports before any time limit is armed: an import cut short
+    # by SolverTimeout would leave a half-initialised module behind
+    sp.Symbol, signal.residue
+
+
+def _run_chunk(chunk, budget):
+    _load_modules()
+    return [_run_job(index, operation, args, budget) for index, operation, args in chunk]
+
+
+#### fan-out of symbolic jobs over a process pool
+def solve_symbolic_batch(jobs, timeout=10.0, processes=0, chunksize=8, fallback=True, max_degree=None):
+    """
+    Runs many symbolic solver calls across worker processes and yields their
+    results as they complete.
+
+    Every job gets its own wall-clock limit inside its worker. A job that
+    overruns is rerun with its numeric equivalent (numeric residues, numeric
+    roots, numeric crossover) and flagged approximate, so one pathological
+    expression costs at most about 2 × timeout instead of stalling the run.
+
+    Args:
+        jobs: iterable of (operation, args) pairs, operation being one of
+            partial_fraction_decomposition, inverse_laplace_transform, split_system,
+            find_magnitude, find_poles_and_zeros, find_phase_margin, and args the
+            positional arguments of that function, e.g.
+            ("inverse_laplace_transform", (eq, s))
+        timeout: seconds per job (None for no limit); enforced with SIGALRM, so
+            only on POSIX systems
+        processes: worker processes; None or 1 runs serially in this interpreter,
+            0 uses one worker per CPU core
+        chunksize: jobs handed to a worker at a time; results stream back per chunk
+        fallback: rerun overrunning jobs numerically (default) or report them as errors
+        max_degree: jobs whose denominator degree is higher go straight to the
+            numeric equivalent (see SolverBudget)
+
+    Yields:
+        SymbolicJobResult objects in completion order; .index is the job's position
+    """
+    indexed = []
+    for index, (operation, args) in enumerate(jobs):
+        if operation not in _OPERATIONS:
+            raise ValueError(f"unknown operation {operation!r}; expected one of {sorted(_OPERATIONS)}")
+        indexed.append((index, operation, tuple(args)))
+    chunks = [indexed[i:i + chunksize] for i in range(0, len(indexed), chunksize)]
+    budget = SolverBudget(seconds=timeout, max_degree=max_degree, fallback=fallback)
+
+    if processes in (None, 1):
+        for chunk in chunks:
+            yield from _run_chunk(chunk, budget)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    pool = ProcessPoolExecutor(max_workers=processes or os.cpu_count())
+    try:
+        futures = [pool.submit(_run_chunk, chunk, budget) for chunk in chunks]
+        for future in as_completed(futures):
+            yield from future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+#### how to use
+# s = sp.symbols('s', real=True)
+# jobs = [("inverse_laplace_transform", (num / den, s)) for num, den in systems]
+# for result in solve_symbolic_batch(jobs, timeout=5.0):
+#     print(result)                                   ##### streams in as workers finish
+# results = sorted(solve_symbolic_batch(jobs), key=lambda r: r.index)
@@ -1,55 +1,606 @@
+import functools
+import math
+
 import numpy as np
-import matplotlib.pyplot as plt
-import control as ctrl 
-import sympy as sp
+from ._lazy import lazy_import
+from .budget import solve_within
+from .cache import symbolic_cache
+from .instrumentation import instrument, stage
+from .plotting_poles_and_zeros import poles_and_zeros
+from .polynomials import batch_roots, polymul_batch, polyval_batch
+from .results import (CrossoversBatch, Decomposition, ExpressionResult, FrequencySplit, Magnitude, PhaseMargin,
+                      PolesZeros)
+
+sp = lazy_import("sympy")
+signal = lazy_import("scipy.signal")
 
 
 ######## partial fraction decomposition
-def partial_fraction_decomposition(num, den):
-    s = sp.symbols('s', real = True)
+@instrument()
+@symbolic_cache.memoize("partial_fraction_decomposition")
+def _partial_fractions(num, den):
     eq = num / den
-    partial_fraction_decomposition = sp.simplify(sp.apart(eq))
-    return print(f"The decomposition is: {partial_fraction_decomposition}")
+    with stage("sympy.apart"):
+        eq = sp.apart(eq)
+    with stage("sympy.simplify"):
+        return sp.simplify(eq)
+
+
+def partial_fraction_decomposition(num, den, verbose=True, budget=None):
+    """
+    Partial fractions of num/den as a Decomposition. budget (seconds or a
+    SolverBudget) bounds sp.apart/sp.simplify; past it the decomposition comes
+    from numeric residues and is flagged approximate.
+    """
+    expression, approximate = solve_within(budget, lambda: _partial_fractions(num, den),
+                                           lambda: _numeric_partial_fractions(num, den),
+                                           num / den, _laplace_variable(num, den))
+    result = Decomposition(expression, approximate)
+    return result.show() if verbose else result
 
 ##### inverse laplace transform
-def inverse_laplace_transform(eq,s):
+def _split_delay(term, s):
+    """
+    Splits a product into (θ, rest) with term = rest·e^{-θs}; None when an
+    exponential is not linear in s.
+    """
+    delay, rest = sp.S.Zero, []
+    for factor in sp.Mul.make_args(term):
+        base, exponent = factor.as_base_exp()
+        if base is sp.E and exponent.has(s):
+            exponent = sp.expand(exponent)
+            if not exponent.is_polynomial(s) or sp.degree(exponent, s) > 1:
+                return None
+            delay -= exponent.coeff(s, 1)
+            rest.append(sp.exp(exponent.coeff(s, 0)))
+        else:
+            rest.append(factor)
+    return delay, sp.Mul(*rest)
+
+
+def _delay_groups(eq, s):
+    """
+    Writes eq as Σ_θ N_θ(s)·e^{-θs} / D(s) with polynomials N_θ and D.
+
+    Returns:
+        ({θ: N_θ}, D), or None when eq is not a rational function of s with delays
+    """
+    numer, denom = sp.fraction(sp.together(sp.powsimp(sp.sympify(eq))))
+    split = _split_delay(denom, s)
+    if split is None or not split[1].is_polynomial(s):
+        return None
+    denom_delay, denom = split
+    groups = {}
+    for term in sp.Add.make_args(sp.expand(numer)):
+        split = _split_delay(term, s)
+        if split is None or not split[1].is_polynomial(s):
+            return None
+        delay = sp.simplify(split[0] - denom_delay)
+        if delay.has(s) or delay.is_negative:
+            return None
+        groups[delay] = groups.get(delay, sp.S.Zero) + split[1]
+    return groups, denom
+
+
+def _pole_multiplicities(den, s):
+    """
+    Roots of den with multiplicities. With numeric coefficients, den is factored
+    over the rationals: factors up to degree 2 are solved exactly and higher ones
+    numerically, since the Cardano/Ferrari radicals of a cubic or quartic make
+    every residue after them practically impossible to simplify.
+    """
+    if den.free_symbols - {s}:
+        roots = sp.roots(den)
+        return roots if sum(roots.values()) == den.degree() else None
+    roots = {}
+    for factor, power in den.factor_list()[1]:
+        # an irreducible factor has simple roots
+        found = sp.roots(factor) if factor.degree() <= 2 else dict.fromkeys(factor.nroots(), 1)
+        for root, m in found.items():
+            roots[root] = roots.get(root, 0) + m * power
+    return roots
+
+
+def _conjugate_in(pole, poles, tol=1e-9):
+    target = complex(pole).conjugate()
+    return any(abs(complex(q) - target) <= tol * max(1.0, abs(target)) for q in poles)
+
+
+@instrument()
+def _residue_modes(eq, s):
+    """
+    Residue expansion of a rational function of s with delays.
+
+    Returns:
+        (modes, impulses), where f(t) = Σ A·τ^k·e^{pτ}·H(τ) over modes (θ, p, k, A)
+        with τ = t - θ, plus Σ c·δ^{(k)}(t - θ) over impulses (θ, k, c);
+        None when eq is not of that form or its poles cannot be found
+    """
+    grouped = _delay_groups(eq, s)
+    if grouped is None:
+        return None
+    groups, den = grouped
+    # floats are solved as the rationals they denote, so repeated poles stay repeated
+    approximate = any(expr.has(sp.Float) for expr in [den, *groups.values()])
+    if approximate:
+        den = sp.nsimplify(den, rational=True)
+        groups = {delay: sp.nsimplify(num, rational=True) for delay, num in groups.items()}
+    den = sp.Poly(den, s)
+    poles = _pole_multiplicities(den, s)
+    if poles is None:
+        return None
+    lead = den.LC()
+
+    modes, impulses = [], []
+    for delay, num in groups.items():
+        quotient, remainder = sp.div(sp.Poly(num, s), den)
+        for k, c in enumerate(reversed(quotient.all_coeffs())):
+            if c != 0:
+                impulses.append((delay, k, c))
+        if remainder.is_zero:
+            continue
+        for pole, m in poles.items():
+            others = lead * sp.Mul(*[(s - q)**n for q, n in poles.items() if q != pole])
+            g = remainder.as_expr() / others
+            for j in range(m):
+                # coefficient of 1/(s - p)^(m - j) is g^(j)(p) / j!, i.e. A·τ^(m-j-1) in time
+                residue = sp.diff(g, s, j).subs(s, pole) / sp.factorial(j)
+                # numeric poles give float residues; only exact ones are worth simplifying
+                if residue.has(sp.Float):
+                    residue = sp.N(residue)
+                    # real coefficients: a real pole has a real residue
+                    residue = sp.re(residue) if pole.is_real else residue
+                else:
+                    residue = sp.radsimp(sp.cancel(residue))
+                residue = residue / sp.factorial(m - j - 1)
+                if residue != 0:
+                    modes.append((delay, pole, m - j - 1, residue))
+    if approximate:
+        modes = [(sp.N(delay), sp.N(pole), k, sp.N(sp.expand_complex(residue))) for delay, pole, k, residue in modes]
+        impulses = [(sp.N(delay), k, sp.N(c)) for delay, k, c in impulses]
+    return modes, impulses
+
+
+def _modes_to_expression(modes, impulses, t):
+    """Closed-form f(t), combining complex-conjugate poles into damped sines and cosines."""
+    parts = {}
+    poles = [pole for _, pole, _, _ in modes]
+    for delay, pole, k, residue in modes:
+        tau = t - delay
+        if pole.is_number and not pole.is_real and _conjugate_in(pole, poles):
+            if complex(pole).imag < 0:
+                continue
+            sigma, omega = sp.re(pole), sp.im(pole)
+            a, b = sp.re(sp.expand_complex(residue)), sp.im(sp.expand_complex(residue))
+            term = 2 * tau**k * sp.exp(sigma * tau) * (a * sp.cos(omega * tau) - b * sp.sin(omega * tau))
+        else:
+            term = residue * tau**k * sp.exp(pole * tau)
+        parts[delay] = parts.get(delay, sp.S.Zero) + term
+    expr = sum((part * sp.Heaviside(t - delay) for delay, part in parts.items()), sp.S.Zero)
+    return expr + sum((c * sp.DiracDelta(t - delay, k) if k else c * sp.DiracDelta(t - delay)
+                       for delay, k, c in impulses), sp.S.Zero)
+
+
+#### numeric equivalents, used when an exact solve is too slow
+def _numeric_residues(num, den, tol=1e-3):
+    """
+    Residues of num/den from float coefficient arrays (highest power first).
+
+    Returns:
+        ([(pole, power, residue)], quotient): residue / (s - pole)^power terms, with
+        negligible residues dropped, and the polynomial part, highest power first
+    """
+    residues, poles, quotient = signal.residue(num, den, tol=tol)
+    scale = 1e-10 * max(1.0, np.max(np.abs(residues), initial=0.0))
+    terms = []
+    power = 0
+    for i, (residue, pole) in enumerate(zip(residues, poles)):
+        power = power + 1 if i and abs(pole - poles[i - 1]) <= tol * max(1.0, abs(pole)) else 1
+        if abs(pole.imag) <= tol * max(1.0, abs(pole)):
+            # real coefficients: a real pole has a real residue
+            pole, residue = pole.real, residue.real
+        if abs(residue) > scale:
+            terms.append((complex(pole), power, complex(residue)))
+    return terms, quotient
+
+
+def _complex_number(z):
+    return sp.Float(z.real) + sp.I * sp.Float(z.imag) if z.imag else sp.Float(z.real)
+
+
+def _numeric_partial_fractions(num, den):
+    """Partial fractions with float residues and poles; conjugate simple poles are combined."""
+    s = _laplace_variable(num, den)
+    terms, quotient = _numeric_residues(_coefficient_arrays(num, s)[0], _coefficient_arrays(den, s)[0])
+    expr = sum((sp.Float(c) * s**k for k, c in enumerate(quotient[::-1]) if c), sp.S.Zero)
+    for pole, power, residue in terms:
+        if pole.imag and power == 1:
+            if pole.imag < 0:
+                continue
+            # r/(s-p) + conj(r)/(s-conj(p)) = (2 Re r·s - 2 Re(r·conj(p))) / (s² - 2 Re p·s + |p|²)
+            expr += ((sp.Float(2 * residue.real) * s - sp.Float(2 * (residue * pole.conjugate()).real))
+                     / (s**2 - sp.Float(2 * pole.real) * s + sp.Float(abs(pole)**2)))
+        else:
+            expr += _complex_number(residue) / (s - _complex_number(pole))**power
+    return expr
+
+
+def _numeric_inverse_laplace(eq, s):
+    """Inverse Laplace transform from float residues, in the same closed form as the exact path."""
+    grouped = _delay_groups(eq, s)
+    if grouped is None:
+        raise ValueError(f"{eq} is not a rational function of {s} with delays")
+    groups, den = grouped
+    den = _coefficient_arrays(den, s)[0]
+    modes, impulses = [], []
+    for delay, num in groups.items():
+        delay = sp.Float(float(delay))
+        terms, quotient = _numeric_residues(_coefficient_arrays(num, s)[0], den)
+        impulses += [(delay, k, sp.Float(c)) for k, c in enumerate(quotient[::-1]) if c]
+        for pole, power, residue in terms:
+            modes.append((delay, _complex_number(pole), power - 1,
+                           _complex_number(residue / math.factorial(power - 1))))
+    return _modes_to_expression(modes, impulses, sp.symbols('t', real=True))
+
+
+@instrument()
+@symbolic_cache.memoize("inverse_laplace_transform", version=3)
+def _inverse_laplace(eq, s):
     t = sp.symbols('t',real= True)
-    output = sp.inverse_laplace_transform(eq,s,t)
-    return print(output)
+    expansion = _residue_modes(eq, s)
+    if expansion is not None:
+        return _modes_to_expression(*expansion, t)
+    with stage("sympy.inverse_laplace_transform"):
+        return sp.inverse_laplace_transform(eq,s,t)
 
 
-#### splitting the system into imaginary and real parts 
-def split_system(num,den):
-    s = sp.symbols('s', real = True)
-    eq = num / den 
-    real_part = sp.simplify(sp.re(eq))
-    imag_part = sp.simplify(sp.im(eq))
-    return print(f'Real part: {real_part}, Imaginary part: {imag_part}')
+def inverse_laplace_transform(eq, s, verbose=True, budget=None):
+    """
+    f(t) = L⁻¹{eq} as an ExpressionResult. Past the budget (seconds or a
+    SolverBudget) the residues are found numerically and the result is flagged
+    approximate.
+    """
+    expression, approximate = solve_within(budget, lambda: _inverse_laplace(eq, s),
+                                           lambda: _numeric_inverse_laplace(eq, s), eq, s)
+    result = ExpressionResult(expression, approximate=approximate)
+    return result.show() if verbose else result
 
 
-#### finding magnitude 
-def find_magnitude(eq):
-    s = sp.symbols('s', real = True)
-    w = sp.symbols('w', real = True)
-    new_eq = eq.subs(s,w*sp.I)
+class CompiledInverseLaplace:
+    """
+    f(t) = L⁻¹{F(s)} of a rational F(s) with delay factors e^{-θs}, compiled for
+    NumPy evaluation on large time grids.
+
+    The residue expansion is found once; evaluating it is a sum of
+    A·τ^k·e^{pτ} terms (τ = t - θ, zero before the delay) with no lambdify or
+    sympy calls. Impulses δ^{(k)}(t - θ) from improper terms are kept in
+    `impulses` but left out of the evaluated values.
+    """
+
+    def __init__(self, eq, s):
+        expansion = _residue_modes(eq, s)
+        if expansion is None:
+            raise ValueError(f"{eq} is not a rational function of {s} with delays")
+        modes, self.impulses = expansion
+        self.expression = _modes_to_expression(modes, self.impulses, sp.symbols('t', real=True))
+        try:
+            self.delays = np.array([float(delay) for delay, _, _, _ in modes])
+            self.poles = np.array([complex(pole) for _, pole, _, _ in modes])
+            self.powers = np.array([k for _, _, k, _ in modes], dtype=int)
+            self.residues = np.array([complex(residue) for _, _, _, residue in modes])
+        except TypeError:
+            raise ValueError(f"{eq} has symbolic parameters; substitute values before compiling") from None
+
+    def __call__(self, t):
+        t = np.asarray(t, dtype=float)
+        values = np.zeros(t.shape, dtype=complex)
+        for delay, pole, power, residue in zip(self.delays, self.poles, self.powers, self.residues):
+            tau = t - delay
+            started = tau >= 0
+            values[started] += residue * tau[started]**power * np.exp(pole * tau[started])
+        return values.real
+
+
+@functools.lru_cache(maxsize=128)
+def compile_inverse_laplace(eq, s):
+    """
+    Cached CompiledInverseLaplace of eq in s.
+
+    Args:
+        eq: sympy expression, a ratio of polynomials in s optionally multiplied by exp(-θ*s)
+        s: the Laplace variable
+
+    Returns:
+        A callable f with f(t) evaluating the inverse transform on a NumPy array t
+    """
+    return CompiledInverseLaplace(sp.sympify(eq), s)
+
+
+#### splitting the system into imaginary and real parts
+def _frequency_polynomials(expr, s, w):
+    """
+    Re and Im of a polynomial at s = jω, as polynomials in ω.
+
+    The coefficient of s^k contributes c·j^k·ω^k, so even powers go to the real part
+    and odd powers to the imaginary part with alternating signs. Expressions without
+    s are taken as already written in ω. Coefficients stay exact, and their own
+    real/imaginary split only touches the coefficients, never the whole fraction.
+    """
+    if expr.has(s):
+        coeffs = [c * sp.I**k for k, c in enumerate(reversed(sp.Poly(expr, s).all_coeffs()))]
+    else:
+        coeffs = list(reversed(sp.Poly(expr, w).all_coeffs()))
+    real = imag = sp.S.Zero
+    for k, c in enumerate(coeffs):
+        c_re, c_im = sp.expand_complex(c).as_real_imag()
+        real += c_re * w**k
+        imag += c_im * w**k
+    return real, imag
+
+
+def _frequency_parts_exact(eq):
+    """
+    (N_re, N_im, D_re, D_im) of G(jω) = N(jω)/D(jω) and the frequency symbol ω.
+    """
+    w = sp.symbols('w', real=True)
+    s = _laplace_variable(eq)
+    num, den = sp.fraction(sp.together(sp.sympify(eq)))
+    return _frequency_polynomials(num, s, w) + _frequency_polynomials(den, s, w), w
+
+
+@functools.lru_cache(maxsize=128)
+def _frequency_evaluator(exprs, w):
+    """
+    Compiles sympy expressions in ω to a NumPy function evaluate(omega, **parameters)
+    returning one float array per expression.
+    """
+    parameters = sorted(set().union(*(e.free_symbols for e in exprs)) - {w}, key=str)
+    compiled = sp.lambdify((w, *parameters), list(exprs), 'numpy')
+
+    def evaluate(omega, **values):
+        omega = np.asarray(omega, dtype=float)
+        out = compiled(omega, *[values[p.name] for p in parameters])
+        return tuple(np.broadcast_to(np.asarray(o, dtype=float), omega.shape) for o in out)
+    return evaluate
+
+
+@instrument()
+@symbolic_cache.memoize("split_system", version=2)
+def _real_imag_parts(num, den):
+    (n_re, n_im, d_re, d_im), w = _frequency_parts_exact(num / den)
+    # G = N·conj(D) / |D|²
+    denominator = sp.expand(d_re**2 + d_im**2)
+    real_part = sp.expand(n_re * d_re + n_im * d_im) / denominator
+    imag_part = sp.expand(n_im * d_re - n_re * d_im) / denominator
+    return real_part, imag_part
 
-    real_part = sp.simplify(sp.re(new_eq))
-    imag_part = sp.simplify(sp.im(new_eq))
-    magnitude = sp.simplify(sp.sqrt(real_part**2 + imag_part**2))
-    return print(f'Magnitude: {magnitude}')
+
+_poly = np.polynomial.polynomial
+
+
+def _float_polynomial(ascending, w):
+    return sum((sp.Float(c) * w**k for k, c in enumerate(ascending) if c), sp.S.Zero)
+
+
+def _numeric_frequency_parts(eq):
+    """(N_re, N_im, D_re, D_im) of G(jω) as ascending float ω-coefficients."""
+    s = _laplace_variable(eq)
+    parts = ()
+    for poly in sp.fraction(sp.together(sp.sympify(eq))):
+        parts += tuple(part[0] for part in _frequency_parts(_coefficient_arrays(poly, s)[:, ::-1]))
+    return parts
+
+
+def _numeric_real_imag_parts(num, den):
+    """Float-coefficient counterpart of _real_imag_parts, from NumPy polynomial products."""
+    n_re, n_im, d_re, d_im = _numeric_frequency_parts(num / den)
+    mul, add, sub = _poly.polymul, _poly.polyadd, _poly.polysub
+    w = sp.symbols('w', real=True)
+    denominator = _float_polynomial(add(mul(d_re, d_re), mul(d_im, d_im)), w)
+    return (_float_polynomial(add(mul(n_re, d_re), mul(n_im, d_im)), w) / denominator,
+            _float_polynomial(sub(mul(n_im, d_re), mul(n_re, d_im)), w) / denominator)
+
+
+def split_system(num, den, verbose=True, budget=None):
+    """
+    Real and imaginary parts of G(jω) = num/den as a FrequencySplit, which is also a
+    vectorized evaluator split(omega, **parameters) -> (real, imag) arrays; parameters
+    give values for any symbols besides s, e.g. split(w, k=2.0).
+    Past the budget the parts get float coefficients and are flagged approximate.
+    """
+    (real_part, imag_part), approximate = solve_within(budget, lambda: _real_imag_parts(num, den),
+                                                       lambda: _numeric_real_imag_parts(num, den),
+                                                       num / den, _laplace_variable(num, den))
+    result = FrequencySplit(real_part, imag_part,
+                            _frequency_evaluator((real_part, imag_part), sp.symbols('w', real=True)),
+                            approximate)
+    return result.show() if verbose else result
+
+
+#### finding magnitude
+@instrument()
+@symbolic_cache.memoize("find_magnitude")
+def _magnitude(eq):
+    (n_re, n_im, d_re, d_im), w = _frequency_parts_exact(eq)
+    return sp.sqrt(sp.expand(n_re**2 + n_im**2)) / sp.sqrt(sp.expand(d_re**2 + d_im**2))
+
+
+def _numeric_magnitude(eq):
+    n_re, n_im, d_re, d_im = _numeric_frequency_parts(eq)
+    mul, add = _poly.polymul, _poly.polyadd
+    w = sp.symbols('w', real=True)
+    return (sp.sqrt(_float_polynomial(add(mul(n_re, n_re), mul(n_im, n_im)), w))
+            / sp.sqrt(_float_polynomial(add(mul(d_re, d_re), mul(d_im, d_im)), w)))
+
+
+def find_magnitude(eq, verbose=True, budget=None):
+    """
+    |G(jω)| of eq as a Magnitude, which is also a vectorized evaluator
+    magnitude(omega, **parameters) -> array.
+    Past the budget it gets float coefficients and is flagged approximate.
+    """
+    magnitude, approximate = solve_within(budget, lambda: _magnitude(eq), lambda: _numeric_magnitude(eq),
+                                          eq, _laplace_variable(eq))
+    result = Magnitude(magnitude, _frequency_evaluator((magnitude,), sp.symbols('w', real=True)), approximate)
+    return result.show() if verbose else result
 
 
 #### finding the poles/ zeros of the system
-def find_poles_and_zeros(num,den):
+def _numeric_poles_and_zeros(num, den, cancellation_tol):
+    s = _laplace_variable(num, den)
+    return poles_and_zeros(_coefficient_arrays(num, s), _coefficient_arrays(den, s), cancellation_tol)[0]
+
+
+def _exact_poles_and_zeros(num, den):
     s =sp.symbols('s', real = True)
     num = sp.poly(num,s)
     den = sp.poly(den,s)
     zeros = num.all_roots()
     poles = den.all_roots()
-    return print(f'Zeros: {zeros}, Poles: {poles}')
+    return PolesZeros(zeros, poles)
+
+
+def find_poles_and_zeros(num, den, numeric=False, cancellation_tol=1e-6, verbose=True, budget=None):
+    """
+    Zeros and poles of num/den as a PolesZeros result.
+
+    By default they are exact (sympy roots, CRootOf for higher orders). With
+    numeric=True they come from poles_and_zeros as floats, and near pole-zero
+    cancellations within cancellation_tol are flagged too. Past the budget the
+    exact roots are replaced by the numeric ones, flagged approximate.
+    """
+    if numeric:
+        result = _numeric_poles_and_zeros(num, den, cancellation_tol)
+        return result.show() if verbose else result
+
+    result, approximate = solve_within(budget, lambda: _exact_poles_and_zeros(num, den),
+                                       lambda: _numeric_poles_and_zeros(num, den, cancellation_tol),
+                                       num / den, sp.symbols('s', real=True))
+    result.approximate = approximate
+    return result.show() if verbose else result
+
+
+#### numeric crossover solver
+def _laplace_variable(*exprs):
+    for expr in exprs:
+        for symbol in sp.sympify(expr).free_symbols:
+            if symbol.name == 's':
+                return symbol
+    return sp.symbols('s', real=True)
+
 
+def _coefficient_arrays(expr, s, gain=None, gain_values=None):
+    """
+    Coefficients of the polynomial expr in s (highest power first) as a (K, d + 1)
+    array, one row per gain value, or a single row when no gain is given.
+    """
+    coeffs = sp.Poly(sp.expand(expr), s).all_coeffs()
+    allowed = {gain} if gain is not None else set()
+    stray = set().union(*(sp.sympify(c).free_symbols for c in coeffs)) - allowed
+    if stray:
+        raise ValueError(f"unresolved symbols {sorted(map(str, stray))}; pass them as gain=...")
+    if gain is None:
+        return np.array([[float(c) for c in coeffs]])
+    values = np.atleast_1d(np.asarray(gain_values, dtype=float))
+    columns = sp.lambdify(gain, coeffs, 'numpy')(values)
+    return np.stack([np.broadcast_to(np.asarray(c, dtype=float), values.shape) for c in columns], axis=1)
 
-def find_phase_margin(num, den):
+
+#### Re/Im of (jω)^i for i = 0, 1, 2, 3 (mod 4)
+_RE_SIGN = np.array([1.0, 0.0, -1.0, 0.0])
+_IM_SIGN = np.array([0.0, 1.0, 0.0, -1.0])
+
+
+def _frequency_parts(ascending):
+    """
+    Splits the ascending coefficients of P(s) into the ascending ω-coefficients of
+    Re P(jω) (even powers) and Im P(jω) (odd powers).
+    """
+    powers = np.arange(ascending.shape[1]) % 4
+    return ascending * _RE_SIGN[powers], ascending * _IM_SIGN[powers]
+
+
+def _positive_real_roots(descending, tol=1e-6):
+    """
+    Distinct positive real roots of every row, sorted ascending and NaN-padded.
+    """
+    roots = batch_roots(descending)
+    scale = np.maximum(1.0, np.abs(roots))
+    real = np.where((np.abs(roots.imag) <= tol * scale) & (roots.real > 0), roots.real, np.nan)
+    real = np.sort(real, axis=1)
+    repeated = np.zeros_like(real, dtype=bool)
+    repeated[:, 1:] = np.abs(np.diff(real, axis=1)) <= tol * np.maximum(1.0, real[:, 1:])
+    real = np.sort(np.where(repeated, np.nan, real), axis=1)
+    keep = ~np.all(np.isnan(real), axis=0)
+    return real[:, keep]
+
+
+@instrument(size=lambda num, den, gain=None, gain_values=None: np.size(gain_values) if gain is not None else 1)
+def find_crossovers(num, den, gain=None, gain_values=None):
+    """
+    Finds every gain and phase crossover of G(s) = num/den numerically.
+
+    The gain crossover condition |N(jω)|² - |D(jω)|² = 0 and the phase crossover
+    condition Im(N(jω)·conj(D(jω))) = 0 are real polynomials in ω whose roots come
+    from companion-matrix eigenvalues, so no symbolic solve is needed.
+
+    Args:
+        num, den: sympy polynomials in s
+        gain: optional symbol (e.g. k) appearing in num/den
+        gain_values: values of gain to sweep; all are solved in one batched call
+
+    Returns:
+        A CrossoversBatch with
+        - gain_values: the swept values (None without a gain)
+        - gain_crossovers, phase_margins (degrees): arrays of shape (K, m)
+        - phase_crossovers, gain_margins (absolute ratio): arrays of shape (K, p)
+        Rows belong to gain values (one row without a gain), sorted by frequency
+        and padded with NaN; indexing it with i gives the Crossovers of row i.
+    """
+    s = _laplace_variable(num, den)
+    n_desc = _coefficient_arrays(num, s, gain, gain_values)
+    d_desc = _coefficient_arrays(den, s, gain, gain_values)
+    rows = max(n_desc.shape[0], d_desc.shape[0])
+    width = max(n_desc.shape[1], d_desc.shape[1])
+    n_asc = np.zeros((rows, width))
+    d_asc = np.zeros((rows, width))
+    n_asc[:, :n_desc.shape[1]] = n_desc[:, ::-1]
+    d_asc[:, :d_desc.shape[1]] = d_desc[:, ::-1]
+
+    n_re, n_im = _frequency_parts(n_asc)
+    d_re, d_im = _frequency_parts(d_asc)
+    gain_condition = (polymul_batch(n_re, n_re) + polymul_batch(n_im, n_im)
+                      - polymul_batch(d_re, d_re) - polymul_batch(d_im, d_im))
+    phase_condition = polymul_batch(n_im, d_re) - polymul_batch(n_re, d_im)
+
+    def response(w):
+        # NaN-padded frequencies stay NaN without a warning
+        with np.errstate(invalid='ignore'):
+            return polyval_batch(n_asc[:, ::-1], 1j * w) / polyval_batch(d_asc[:, ::-1], 1j * w)
+
+    w_c = _positive_real_roots(gain_condition[:, ::-1])
+    phase_margins = (np.degrees(np.angle(response(w_c))) + 360) % 360 - 180
+
+    w_p = _positive_real_roots(phase_condition[:, ::-1])
+    g_p = response(w_p)
+    # Im G = 0 also holds where the phase passes through 0; keep only the -180 crossings
+    w_p = np.where(g_p.real < 0, w_p, np.nan)
+    order = np.argsort(w_p, axis=1)
+    w_p = np.take_along_axis(w_p, order, axis=1)
+    gain_margins = np.take_along_axis(np.where(g_p.real < 0, 1 / np.abs(g_p), np.nan), order, axis=1)
+
+    gain_values = None if gain is None else np.atleast_1d(np.asarray(gain_values, dtype=float))
+    return CrossoversBatch(gain_values, w_c, phase_margins, w_p, gain_margins)
+
+
+def _numeric_phase_margin(num, den):
+    crossovers = find_crossovers(num, den)[0]
+    if not crossovers.gain_crossovers.size:
+        return PhaseMargin(np.nan, np.nan)
+    return PhaseMargin(crossovers.gain_crossovers[-1], crossovers.phase_margins[-1])
+
+
+def _exact_phase_margin(num, den):
     s = sp.symbols('s', real=True)
     eq = num / den
 
@@ -61,11 +612,12 @@ def find_phase_margin(num, den):
     magnitude = sp.sqrt(real_part**2 + imag_part**2)
 
 
-    w_g_solutions = sp.solve(sp.Eq(magnitude, 1), w)
+    with stage("sympy.solve"):
+        w_g_solutions = sp.solve(sp.Eq(magnitude, 1), w)
     w_g_solutions = [sol.evalf() for sol in w_g_solutions if sol.is_real and sol > 0]
 
     if not w_g_solutions:
-        return print("No valid gain crossover frequency found.")
+        return PhaseMargin(np.nan, np.nan)
 
     w_g = w_g_solutions[-1]  
 
@@ -74,14 +626,35 @@ def find_phase_margin(num, den):
 
     phase_margin = 180 + phase_deg.evalf()
 
-    return print(f"Cross-over frequency: {w_g:.3f} rad/s, Phase margin: {phase_margin:.2f} degrees")
+    return PhaseMargin(w_g, phase_margin)
+
+
+@instrument()
+def find_phase_margin(num, den, numeric=False, verbose=True, budget=None):
+    """
+    Gain cross-over frequency and phase margin of num/den as a PhaseMargin result
+    (NaN when there is no crossover).
+    With numeric=True the crossover is found with find_crossovers instead of sp.solve;
+    the same happens, with the result flagged approximate, once sp.solve runs past
+    the budget (seconds or a SolverBudget).
+    """
+    if numeric:
+        result = _numeric_phase_margin(num, den)
+        return result.show() if verbose else result
 
+    result, approximate = solve_within(budget, lambda: _exact_phase_margin(num, den),
+                                       lambda: _numeric_phase_margin(num, den),
+                                       num / den, sp.symbols('s', real=True))
+    result.approximate = approximate
+    return result.show() if verbose else result
 
-s = sp.symbols('s', real = True)
-num = 40
-den = (s+1)**2
-find_phase_margin(num,den)
-# find_magnitude(num/den)
+
+if __name__ == "__main__":
+    s = sp.symbols('s', real = True)
+    num = 40
+    den = (s+1)**2
+    find_phase_margin(num,den)
+    # find_magnitude(num/den)
 
 
 #### sample runs
@@ -90,7 +663,14 @@ find_phase_margin(num,den)
 # den = (s+2)*(s+3)
 # partial_fraction_decomposition(num,den)
 # inverse_laplace_transform(num/den,s)
+# f = compile_inverse_laplace(sp.exp(-2*s)*num/den, s)
+# y = f(np.linspace(0, 20, 100000))
 # find_poles_and_zeros(num,den)
+# find_poles_and_zeros(num, den*(s+1), numeric=True)
+
+# k = sp.symbols('k', real = True)
+# find_phase_margin(s+3, s**3+6*s**2+5*s, numeric=True)
+# sweep = find_crossovers(k*(s+3), s**3+6*s**2+5*s, gain=k, gain_values=np.linspace(1, 50, 1000))
 
 
 